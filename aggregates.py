@@ -0,0 +1,236 @@
+"""
+Mergeable label distributions for scored reviews
+
+A SentimentAggregate keeps, for every label seen, a fixed-size histogram of
+result scores in one NumPy array. Counts, percentages and mean scores are
+all read off that array, so dashboards never go back to the raw
+predictions. Aggregates built in separate processes or sessions merge by
+adding arrays, and serialize to a few hundred bytes.
+"""
+import json
+import struct
+
+import numpy as np
+
+from results import Label
+
+# Score histogram bins spanning SCORE_RANGE; scores outside it are clipped.
+# Sentiment scores lie in [-1, 1], confidences and emotion shares in [0, 1]
+BINS = 20
+SCORE_RANGE = (-1.0, 1.0)
+
+_HEADER = struct.Struct("<I")
+
+
+class SentimentAggregate:
+    """Counts and score histograms per label, updated incrementally"""
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self._ids = {}
+        self.histograms = np.zeros((0, BINS), dtype=np.int64)
+        self.scoreSums = np.zeros(0, dtype=np.float64)
+        self._labelIds(labels)
+
+    def _labelIds(self, labels):
+        """Row of each label, adding rows for unseen labels"""
+        ids = []
+        for label in labels:
+            row = self._ids.get(label)
+            if row is None:
+                row = self._ids[label] = len(self.labels)
+                self.labels.append(label)
+            ids.append(row)
+
+        missing = len(self.labels) - len(self.scoreSums)
+        if missing:
+            self.histograms = np.vstack([self.histograms, np.zeros((missing, BINS), dtype=np.int64)])
+            self.scoreSums = np.concatenate([self.scoreSums, np.zeros(missing)])
+        return np.asarray(ids, dtype=np.int64)
+
+    def update(self, results):
+        """
+        Add scored results
+
+        Args:
+            results (list): results.Result objects, counted by their label code
+
+        Returns:
+            SentimentAggregate: self
+        """
+        if not results:
+            return self
+
+        codes = np.fromiter((result.label for result in results), dtype=np.int64, count=len(results))
+        scores = np.fromiter((result.score for result in results), dtype=np.float64, count=len(results))
+        return self.updateCodes(list(Label), codes, scores)
+
+    def updateArray(self, array):
+        """Add results packed in a results.RESULT_DTYPE array"""
+        return self.updateCodes(list(Label), array["label"], array["score"])
+
+    def updateCodes(self, labels, codes, scores):
+        """
+        Add results given as label codes and scores, e.g. columns of a ResultStore
+
+        Args:
+            labels (list): Label of each code
+            codes (numpy.ndarray): Integer code of each result's label
+            scores (numpy.ndarray): Score of each result
+
+        Returns:
+            SentimentAggregate: self
+        """
+        if not len(codes):
+            return self
+
+        ids = self._labelIds(labels)[np.asarray(codes, dtype=np.int64)]
+        return self._updateIds(ids, np.asarray(scores, dtype=np.float64))
+
+    def _updateIds(self, ids, scores):
+        low, high = SCORE_RANGE
+        bins = np.clip(((scores - low) / (high - low) * BINS).astype(np.int64), 0, BINS - 1)
+        flat = np.bincount(ids * BINS + bins, minlength=self.histograms.size)
+        self.histograms += flat.reshape(self.histograms.shape)
+        self.scoreSums += np.bincount(ids, weights=scores, minlength=len(self.labels))
+        return self
+
+    def add(self, label, score):
+        """Add one scored result"""
+        return self._updateIds(self._labelIds([label]), np.array([score], dtype=np.float64))
+
+    def merge(self, other):
+        """
+        Add another aggregate's counts into this one
+
+        Returns:
+            SentimentAggregate: self
+        """
+        ids = self._labelIds(other.labels)
+        if len(ids):
+            self.histograms[ids] += other.histograms
+            self.scoreSums[ids] += other.scoreSums
+        return self
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def __add__(self, other):
+        return SentimentAggregate().merge(self).merge(other)
+
+    @property
+    def total(self):
+        """Number of results added"""
+        return int(self.histograms.sum())
+
+    def __len__(self):
+        return self.total
+
+    def counts(self):
+        """Label -> count, most frequent first"""
+        counts = self.histograms.sum(axis=1)
+        order = np.argsort(-counts, kind="stable")
+        return {self.labels[i]: int(counts[i]) for i in order if counts[i]}
+
+    def proportions(self):
+        """Label -> share of all results, most frequent first"""
+        total = self.total
+        return {label: count / total for label, count in self.counts().items()}
+
+    def meanScores(self):
+        """Label -> mean score of its results"""
+        counts = self.histograms.sum(axis=1)
+        return {label: float(self.scoreSums[i] / counts[i])
+                for i, label in enumerate(self.labels) if counts[i]}
+
+    def histogram(self, label):
+        """Score histogram of a label and the bin edges"""
+        edges = np.linspace(SCORE_RANGE[0], SCORE_RANGE[1], BINS + 1)
+        row = self._ids.get(label)
+        if row is None:
+            return np.zeros(BINS, dtype=np.int64), edges
+        return self.histograms[row].copy(), edges
+
+    def toDict(self):
+        """JSON-compatible form"""
+        return {
+            "labels": self.labels,
+            "histograms": self.histograms.tolist(),
+            "scoreSums": self.scoreSums.tolist()
+        }
+
+    @classmethod
+    def fromDict(cls, data):
+        aggregate = cls(data["labels"])
+        if aggregate.labels:
+            aggregate.histograms[:] = np.asarray(data["histograms"], dtype=np.int64)
+            aggregate.scoreSums[:] = np.asarray(data["scoreSums"], dtype=np.float64)
+        return aggregate
+
+    def toBytes(self):
+        """Compact binary form: a JSON label header, then the raw arrays"""
+        header = json.dumps(self.labels).encode("utf-8")
+        return _HEADER.pack(len(header)) + header + self.histograms.tobytes() + self.scoreSums.tobytes()
+
+    @classmethod
+    def fromBytes(cls, payload):
+        (size,) = _HEADER.unpack_from(payload)
+        aggregate = cls(json.loads(payload[_HEADER.size:_HEADER.size + size]))
+        offset = _HEADER.size + size
+        count = len(aggregate.labels)
+        aggregate.histograms[:] = np.frombuffer(payload, dtype=np.int64, count=count * BINS,
+                                                offset=offset).reshape(count, BINS)
+        offset += aggregate.histograms.nbytes
+        aggregate.scoreSums[:] = np.frombuffer(payload, dtype=np.float64, count=count, offset=offset)
+        return aggregate
+
+    def __repr__(self):
+        return f"SentimentAggregate({self.counts()})"
+
+
+# Common polarity classes that labels of different backends are compared in
+POLARITY_CLASSES = (Label.POSITIVE, Label.NEUTRAL, Label.NEGATIVE)
+
+# Label -> polarity class; emotions take the polarity of the dominant one
+LABEL_POLARITY = np.array([
+    {
+        Label.HAPPY: Label.POSITIVE,
+        Label.SURPRISE: Label.NEUTRAL,
+        Label.SAD: Label.NEGATIVE,
+        Label.ANGRY: Label.NEGATIVE,
+        Label.FEAR: Label.NEGATIVE,
+        Label.UNAVAILABLE: Label.NEUTRAL
+    }.get(label, label) for label in Label
+], dtype=np.int64)
+
+
+def polarityClass(result):
+    """
+    Map a result of any backend to Label.POSITIVE/NEUTRAL/NEGATIVE
+
+    Emotion results take the polarity of their dominant emotion and results
+    without any emotion are NEUTRAL.
+    """
+    if result.label not in POLARITY_CLASSES and not result.score:
+        return Label.NEUTRAL
+    return Label(LABEL_POLARITY[result.label])
+
+
+def agreementMatrix(resultsByBackend):
+    """
+    Share of texts on which each pair of backends gives the same polarity class
+
+    Args:
+        resultsByBackend (dict): Backend -> results for the same texts
+
+    Returns:
+        tuple: (backend names, numpy.ndarray of shape (n, n) with values in [0, 1])
+    """
+    names = list(resultsByBackend)
+    classes = np.array([[polarityClass(result) for result in resultsByBackend[name]]
+                        for name in names], dtype=np.int64).reshape(len(names), -1)
+
+    if classes.shape[1] == 0:
+        return names, np.eye(len(names))
+    matrix = (classes[:, None, :] == classes[None, :, :]).mean(axis=2)
+    return names, matrix
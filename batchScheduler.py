@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+
+import instrumentation
+import modals
+
+
+def _deliver(resolve, value):
+    """Resolve a future, ignoring one that can no longer be resolved so the worker keeps running"""
+    try:
+        resolve(value)
+    except InvalidStateError:
+        pass
+
+
+class BatchScheduler:
+    """
+    Coalesce single-text requests from many threads into batched model calls
+
+    Callers get a Future right away. A worker thread waits for the first
+    queued text, keeps collecting until ``maxBatch`` texts are queued or
+    ``maxWait`` seconds have passed since that first text arrived, then
+    scores the whole group with one modals.analyzeBatch call and resolves
+    every future.
+
+    Args:
+        backend (str): Package name (Flair/TextBlob/Vader/Text2emotion)
+        maxBatch (int): Largest number of texts scored together
+        maxWait (float): Longest time, in seconds, a text waits for company
+        useCache (bool): Read and fill the result cache
+    """
+
+    def __init__(self, backend, maxBatch=modals.DEFAULT_BATCH_SIZE, maxWait=0.01, useCache=True):
+        self.backend = backend.lower()
+        if self.backend not in modals.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+
+        self.maxBatch = maxBatch
+        self.maxWait = maxWait
+        self.useCache = useCache
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+        self.batches = 0
+        self.items = 0
+        self.largestBatch = 0
+        self.waitTotal = 0.0
+        self.waitMax = 0.0
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"batch-{self.backend}", daemon=True)
+            self._thread.start()
+
+    def submitMany(self, texts):
+        """Queue texts and return one Future per text, in input order"""
+        futures = [Future() for _ in texts]
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BatchScheduler is closed")
+            self._start()
+            self._queue.extend((text, future, now) for text, future in zip(texts, futures))
+            self._condition.notify()
+        return futures
+
+    def submit(self, text):
+        """Queue one text and return a Future of its results.Result"""
+        return self.submitMany([text])[0]
+
+    def score(self, text, timeout=None):
+        """Score one text through the scheduler and wait for its result"""
+        return self.submit(text).result(timeout)
+
+    def _nextBatch(self):
+        """Block until a batch is due and pop it, or return None once closed"""
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return None
+
+            deadline = self._queue[0][2] + self.maxWait
+            while len(self._queue) < self.maxBatch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            count = min(self.maxBatch, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._nextBatch()
+            if batch is None:
+                return
+
+            self._record(batch)
+            # Futures cancelled while queued, e.g. by a dropped service request, are not scored
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            texts = [text for text, _, _ in batch]
+            try:
+                with instrumentation.span(f"batch.{self.backend}.run"):
+                    results = modals.analyzeBatch(texts, self.backend, batchSize=len(texts), useCache=self.useCache)
+            except Exception as e:
+                for _, future, _ in batch:
+                    _deliver(future.set_exception, e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                _deliver(future.set_result, result)
+
+    def _record(self, batch):
+        """Count a batch and how long each of its texts waited in the queue"""
+        now = time.monotonic()
+        waits = [now - enqueued for _, _, enqueued in batch]
+        for wait in waits:
+            instrumentation.observe(f"batch.{self.backend}.queueWait", wait)
+
+        with self._condition:
+            self.batches += 1
+            self.items += len(batch)
+            self.largestBatch = max(self.largestBatch, len(batch))
+            self.waitTotal += sum(waits)
+            self.waitMax = max(self.waitMax, max(waits))
+
+    def stats(self):
+        """
+        Batching counters
+
+        Returns:
+            dict: batches run, texts scored, mean and largest batch size,
+            mean and longest queue wait in seconds, and texts still queued
+        """
+        with self._condition:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "meanBatch": self.items / self.batches if self.batches else 0.0,
+                "largestBatch": self.largestBatch,
+                "meanWait": self.waitTotal / self.items if self.items else 0.0,
+                "maxWait": self.waitMax,
+                "queued": len(self._queue)
+            }
+
+    def close(self):
+        """Score what is already queued, then stop the worker thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# Defaults of the schedulers shared by the Streamlit sessions of a process
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", modals.DEFAULT_BATCH_SIZE))
+BATCH_MAX_WAIT = float(os.environ.get("BATCH_MAX_WAIT", 0.02))
+
+_shared = {}
+_sharedLock = threading.Lock()
+
+
+def sharedScheduler(backend):
+    """Return the process-wide scheduler of a backend, starting it on first use"""
+    key = backend.lower()
+    with _sharedLock:
+        if key not in _shared:
+            _shared[key] = BatchScheduler(key, maxBatch=BATCH_MAX_SIZE, maxWait=BATCH_MAX_WAIT)
+            instrumentation.registerCollector(f"batch.{key}", _shared[key].stats)
+        return _shared[key]
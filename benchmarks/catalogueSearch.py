@@ -0,0 +1,85 @@
+"""
+Local catalogue search benchmark
+
+Builds a catalogue of --titles synthetic titles in a temporary directory,
+then reports the build time, the time to open it and the latency of
+prefix, whole-title and misspelled searches.
+
+Usage:
+    python benchmarks/catalogueSearch.py [--titles 1000000] [--queries 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import movieCatalogue
+
+# English letter frequencies, in percent
+LETTERS = dict(zip("etaoinshrdlcumwfgypbvkjxqz", (12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8,
+                                                  2.8, 2.4, 2.4, 2.2, 2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.2, 0.2,
+                                                  0.1, 0.1)))
+
+
+def syntheticTitles(rng, count, vocabulary=100_000):
+    """Titles of 1-5 words drawn Zipf-like from a vocabulary of random words"""
+    letters = np.array(list(LETTERS))
+    weights = np.array(list(LETTERS.values())) / sum(LETTERS.values())
+    words = ["".join(rng.choice(letters, rng.integers(2, 10), p=weights)).title() for _ in range(vocabulary)]
+    lengths = rng.integers(1, 6, count)
+    picks = np.minimum(rng.zipf(1.1, lengths.sum()) - 1, vocabulary - 1)
+    titles, start = [], 0
+    for length in lengths:
+        titles.append(" ".join(words[i] for i in picks[start:start + length]))
+        start += length
+    return titles
+
+
+def misspell(rng, title):
+    i = int(rng.integers(0, len(title)))
+    return title[:i] + title[i + 1:]
+
+
+def timeQueries(catalogue, queries):
+    latencies = []
+    for query in queries:
+        began = time.perf_counter()
+        catalogue.search(query)
+        latencies.append(time.perf_counter() - began)
+    return np.percentile(latencies, [50, 99]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    titles = syntheticTitles(rng, args.titles)
+    records = ((f"tt{i:07d}", title, "2000", "movie", "N/A") for i, title in enumerate(titles))
+
+    with tempfile.TemporaryDirectory() as path:
+        began = time.perf_counter()
+        movieCatalogue.build(records, path)
+        print(f"build        {args.titles} titles in {time.perf_counter() - began:.1f} s")
+
+        began = time.perf_counter()
+        catalogue = movieCatalogue.MovieCatalogue(path)
+        print(f"open         {(time.perf_counter() - began) * 1000:.1f} ms")
+
+        picks = [titles[i] for i in rng.integers(0, len(titles), args.queries)]
+        for name, queries in (("prefix", [title.split()[0] for title in picks]),
+                              ("title", picks),
+                              ("misspelled", [misspell(rng, title) for title in picks])):
+            p50, p99 = timeQueries(catalogue, queries)
+            print(f"{name:<12} p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
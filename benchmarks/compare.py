@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files from benchmarks/run.py
+
+Prints every metric present in both files with its relative change and
+flags regressions larger than the threshold: lower throughput or speedup,
+higher latency or time. Exits with status 1 when a regression is found.
+
+Usage:
+    python benchmarks/compare.py base.json new.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is better; every other number is a time
+HIGHER_IS_BETTER = {"throughput", "speedup", "inProcessSpeedup", "processSpeedup"}
+IGNORED = {"calls"}
+
+
+def flatten(report, prefix=""):
+    """Yield (path, value) for every number in a nested report"""
+    for key, value in report.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and key not in IGNORED:
+            yield path, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as file:
+        base = dict(flatten(json.load(file)))
+    with open(args.new, encoding="utf-8") as file:
+        new = dict(flatten(json.load(file)))
+
+    regressions = 0
+    for path in sorted(base.keys() & new.keys()):
+        before, after = base[path], new[path]
+        if not before:
+            continue
+        change = (after - before) / before
+        worse = -change if path.rsplit(".", 1)[-1] in HIGHER_IS_BETTER else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{path:<48} {before:12.2f} -> {after:12.2f}  {change:+7.1%}{flag}")
+
+    print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
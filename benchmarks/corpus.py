@@ -0,0 +1,67 @@
+"""
+Fixed corpora and images for the benchmarks
+
+Everything here is deterministic so that two benchmark runs, on two
+commits, score exactly the same inputs.
+"""
+import random
+
+import numpy as np
+
+SAMPLE_REVIEWS = [
+    "This movie was absolutely fantastic! Great story and characters.",
+    "One of the best films I've seen. Highly recommend.",
+    "Excellent cinematography and soundtrack. Loved every minute.",
+    "The movie was okay, nothing special but watchable.",
+    "Not bad, but could have been better. Average at best.",
+    "Disappointing. Expected more from this film.",
+    "The plot is interesting: a detective hunts a killer through a rainy city.",
+    "Amazing performances by the whole cast. Outstanding acting throughout.",
+    "Brilliant direction. Masterful filmmaking from start to finish.",
+    "I was bored halfway through and the ending made no sense at all.",
+    "A warm, funny and surprisingly moving story about growing up.",
+    "Terrible dialogue, wooden acting and a plot full of holes.",
+    "I laughed, I cried, and I would happily watch it again tomorrow.",
+    "The special effects were impressive but the story felt hollow.",
+    "Scary in all the right places; I jumped out of my seat twice.",
+    "What a waste of two hours. I want my money back.",
+]
+
+_OPENERS = ["The film", "This movie", "The sequel", "The story", "The cast", "The soundtrack", "The ending"]
+_VERBS = ["was", "felt", "seemed", "turned out", "is", "looked"]
+_ADJECTIVES = ["wonderful", "awful", "boring", "thrilling", "beautiful", "confusing", "hilarious",
+               "sad", "terrifying", "brilliant", "mediocre", "surprising", "dull", "touching"]
+_TAILS = ["from start to finish", "for most of its runtime", "despite a slow start",
+          "in every scene", "compared to the original", "if you ask me", ""]
+
+
+def syntheticReviews(count, seed=1234, minSentences=1, maxSentences=8):
+    """Generate count reviews of varying length from a fixed seed"""
+    rng = random.Random(seed)
+    reviews = []
+    for _ in range(count):
+        sentences = []
+        for _ in range(rng.randint(minSentences, maxSentences)):
+            sentence = f"{rng.choice(_OPENERS)} {rng.choice(_VERBS)} {rng.choice(_ADJECTIVES)} {rng.choice(_TAILS)}"
+            sentences.append(sentence.strip() + rng.choice([".", "!", "..."]))
+        reviews.append(" ".join(sentences))
+    return reviews
+
+
+def corpus(count, seed=1234):
+    """Sample reviews followed by synthetic ones, count texts in total"""
+    return (SAMPLE_REVIEWS + syntheticReviews(count, seed))[:count]
+
+
+def syntheticImages(count, size=(720, 1280), seed=1234):
+    """Generate count noisy RGB images with a few bright blobs"""
+    rng = np.random.default_rng(seed)
+    height, width = size
+    images = []
+    for _ in range(count):
+        image = rng.integers(0, 64, size=(height, width, 3), dtype=np.uint8)
+        for _ in range(3):
+            y, x = rng.integers(0, height - 100), rng.integers(0, width - 100)
+            image[y:y + 100, x:x + 100] = rng.integers(128, 256, size=3, dtype=np.uint8)
+        images.append(image)
+    return images
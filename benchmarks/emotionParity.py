@@ -0,0 +1,88 @@
+"""
+emotionEngine parity and speed check against text2emotion
+
+Scores the benchmark corpus with text2emotion.get_emotion and with
+emotionEngine.EmotionEngine, reports how many distributions match exactly,
+the largest per-emotion difference and the speedup, and exits with status 1
+when a difference exceeds emotionEngine.TOLERANCE.
+
+Needs the NLTK stopwords, punkt and wordnet data.
+
+Usage:
+    python benchmarks/emotionParity.py [--texts 2000] [--show 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emotionEngine
+from corpus import SAMPLE_REVIEWS, corpus
+
+
+def loadLibrary():
+    import emoji
+    import nltk
+
+    # text2emotion 0.0.5 reads emoji.UNICODE_EMOJI, which emoji 2.0 renamed
+    if not hasattr(emoji, "UNICODE_EMOJI"):
+        emoji.UNICODE_EMOJI = emoji.EMOJI_DATA
+
+    download = nltk.download
+    nltk.download = lambda *args, **kwargs: True
+    try:
+        import text2emotion
+    finally:
+        nltk.download = download
+    return text2emotion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000, help="corpus size")
+    parser.add_argument("--show", type=int, default=5, help="mismatching texts to print")
+    args = parser.parse_args()
+
+    texts = SAMPLE_REVIEWS + [
+        "I can't believe how happy I am 😀 gr8 day!!",
+        "Not bad at all, though the ending wasn't what I hoped for.",
+        "Visit www.example.com for the trailer, it's terrifying.",
+        "",
+    ] + corpus(args.texts)
+
+    te = loadLibrary()
+    start = time.perf_counter()
+    expected = np.array([[te.get_emotion(text)[e] for e in emotionEngine.EMOTIONS] for text in texts])
+    libraryTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = emotionEngine.EmotionEngine()
+    buildTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = engine.distributions(texts)
+    engineTime = time.perf_counter() - start
+
+    difference = np.abs(actual - expected).max(axis=1)
+    exact = int((difference < 1e-9).sum())
+    print(f"texts       {len(texts)}")
+    print(f"exact       {exact} ({exact / len(texts):.1%})")
+    print(f"max diff    {difference.max():.2f} (tolerance {emotionEngine.TOLERANCE})")
+    print(f"library     {libraryTime * 1000:8.1f} ms")
+    print(f"engine      {engineTime * 1000:8.1f} ms  (+{buildTime * 1000:.1f} ms to compile)")
+    print(f"speedup     {libraryTime / engineTime:8.1f}x")
+
+    for i in np.argsort(-difference)[:args.show]:
+        if difference[i] > 1e-9:
+            print(f"  {difference[i]:.2f}  {texts[i][:70]!r}")
+
+    if difference.max() > emotionEngine.TOLERANCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Flair int8 runtime parity and throughput check
+
+Loads the full-precision en-sentiment classifier and a dynamically int8
+quantized copy, scores the benchmark corpus with both at each requested
+thread count and reports label agreement, the largest difference in the
+POSITIVE probability and texts per second. Exits with status 1 when the
+agreement falls below --min-agreement.
+
+Usage:
+    python benchmarks/flairParity.py [--texts 500] [--threads 1 4] [--batch-size 32]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modals
+import results
+from corpus import corpus
+
+
+def predict(classifier, texts, batchSize):
+    """POSITIVE probabilities and labels, with the elapsed time"""
+    from flair.data import Sentence
+
+    sentences = [Sentence(text) for text in texts]
+    start = time.perf_counter()
+    classifier.predict(sentences, mini_batch_size=batchSize)
+    elapsed = time.perf_counter() - start
+
+    positive = np.array([
+        label.score if label.value == "POSITIVE" else 1 - label.score
+        for label in (sentence.labels[0] for sentence in sentences)
+    ])
+    labels = [results.flairLabel(sentence.labels[0].value, sentence.labels[0].score) for sentence in sentences]
+    return positive, labels, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=500, help="corpus size")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="torch thread counts to time")
+    parser.add_argument("--batch-size", type=int, default=modals.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--min-agreement", type=float, default=0.97, help="required label agreement")
+    args = parser.parse_args()
+
+    if not modals.FLAIR_AVAILABLE:
+        sys.exit("flair is not installed")
+
+    import torch
+    from flair.models import TextClassifier
+
+    texts = corpus(args.texts)
+    full = TextClassifier.load('en-sentiment')
+    full.eval()
+    quantized = modals.quantizeFlair(copy.deepcopy(full))
+
+    # Warm both models so one-off allocations stay out of the timings
+    predict(full, texts[:args.batch_size], args.batch_size)
+    predict(quantized, texts[:args.batch_size], args.batch_size)
+
+    agreement = None
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        fullPositive, fullLabels, fullTime = predict(full, texts, args.batch_size)
+        quantizedPositive, quantizedLabels, quantizedTime = predict(quantized, texts, args.batch_size)
+
+        agreement = np.mean([a == b for a, b in zip(fullLabels, quantizedLabels)])
+        print(f"threads {threads}")
+        print(f"  torch     {len(texts) / fullTime:8.1f} texts/s")
+        print(f"  int8      {len(texts) / quantizedTime:8.1f} texts/s  ({fullTime / quantizedTime:.2f}x)")
+        print(f"  agreement {agreement:.1%}")
+        print(f"  max diff  {np.abs(fullPositive - quantizedPositive).max():.3f} (POSITIVE probability)")
+
+    if agreement is not None and agreement < args.min_agreement:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
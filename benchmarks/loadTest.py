@@ -0,0 +1,122 @@
+"""
+Load test for the HTTP scoring service
+
+Starts scoringService in-process under uvicorn (or targets --url), then has
+--clients threads send single-text /v1/score requests back to back for
+--duration seconds. Reports requests per second, latency percentiles and
+the mean batch size the micro-batching scheduler achieved, followed by
+the throughput of one large NDJSON stream.
+
+Usage:
+    python benchmarks/loadTest.py [--backend Vader] [--clients 16] [--duration 10] [--url http://...]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import corpus
+
+
+def startService(backend, port=8123):
+    """Run the service on a daemon thread and wait until it is ready"""
+    import uvicorn
+
+    import scoringService
+
+    scoringService.SERVICE_BACKENDS[:] = [backend.lower()]
+    server = uvicorn.Server(uvicorn.Config(scoringService.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/ready", timeout=1).status_code == 200:
+                return server, url
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("scoring service did not become ready")
+
+
+def client(url, backend, texts, stopAt, latencies, errors):
+    session = requests.Session()
+    i = 0
+    while time.monotonic() < stopAt:
+        began = time.perf_counter()
+        try:
+            response = session.post(f"{url}/v1/score", json={"backend": backend, "text": texts[i % len(texts)]},
+                                    timeout=30)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - began)
+        except requests.RequestException:
+            errors.append(1)
+        i += 1
+
+
+def streamThroughput(url, backend, texts):
+    body = "".join(json.dumps({"id": i, "text": text}) + "\n" for i, text in enumerate(texts))
+    began = time.perf_counter()
+    response = requests.post(f"{url}/v1/score/stream", params={"backend": backend}, data=body.encode("utf-8"),
+                             stream=True, timeout=300)
+    response.raise_for_status()
+    lines = sum(1 for line in response.iter_lines() if line)
+    return lines, time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="Vader")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent single-text clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--stream-texts", type=int, default=5000, help="lines in the NDJSON stream")
+    parser.add_argument("--url", help="existing service, started in-process if omitted")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = startService(args.backend)
+
+    texts = corpus(1000)
+    before = requests.get(f"{url}/stats", timeout=10).json().get(args.backend.lower(), {})
+
+    latencies, errors = [], []
+    stopAt = time.monotonic() + args.duration
+    threads = [threading.Thread(target=client, args=(url, args.backend, texts, stopAt, latencies, errors))
+               for _ in range(args.clients)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    after = requests.get(f"{url}/stats", timeout=10).json().get(args.backend.lower(), {})
+    batches = after.get("batches", 0) - before.get("batches", 0)
+    items = after.get("items", 0) - before.get("items", 0)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000 if latencies else (0, 0, 0)
+    print(f"clients      {args.clients}")
+    print(f"requests     {len(latencies)} ok, {len(errors)} failed")
+    print(f"throughput   {len(latencies) / elapsed:8.1f} req/s")
+    print(f"latency      p50 {p50:.1f} ms  p95 {p95:.1f} ms  p99 {p99:.1f} ms")
+    print(f"mean batch   {items / batches if batches else 0:8.1f} texts per model call")
+
+    lines, seconds = streamThroughput(url, args.backend, corpus(args.stream_texts))
+    print(f"stream       {lines} lines in {seconds:.2f} s ({lines / seconds:.0f} texts/s)")
+
+    if server is not None:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
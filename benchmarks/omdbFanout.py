@@ -0,0 +1,64 @@
+"""
+OMDB detail fan-out benchmark
+
+Fetches the details of every search hit from the local stub server, once
+one request after another with bare requests.get calls (the old getData
+behaviour) and once through OmdbClient.mapConcurrent, and reports the
+wall-clock speedup.
+
+Usage:
+    python benchmarks/omdbFanout.py [--latency 0.1] [--results 10] [--workers 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import omdbClient
+from omdbStub import startStubServer
+
+
+def serialFetch(baseURL, query):
+    response = requests.get(f"{baseURL}/?s={query}&apikey=stub", timeout=10).json()
+    return [requests.get(f"{baseURL}/?i={hit['imdbID']}&apikey=stub", timeout=10).json()
+            for hit in response["Search"]]
+
+
+def concurrentFetch(client, query):
+    response = client.search(query)
+    return client.mapConcurrent(client.details, [hit["imdbID"] for hit in response["Search"]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.1, help="stub response delay in seconds")
+    parser.add_argument("--results", type=int, default=10, help="titles returned per search")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent detail requests")
+    args = parser.parse_args()
+
+    server, baseURL = startStubServer(latency=args.latency, results=args.results)
+    client = omdbClient.OmdbClient(baseURL, "stub", maxWorkers=args.workers, rate=0)
+
+    try:
+        start = time.perf_counter()
+        serial = serialFetch(baseURL, "star")
+        serialTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = concurrentFetch(client, "star")
+        concurrentTime = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    assert serial == concurrent, "concurrent fetch returned different records"
+    print(f"serial      {serialTime * 1000:8.1f} ms  ({len(serial) + 1} requests)")
+    print(f"concurrent  {concurrentTime * 1000:8.1f} ms  ({args.workers} workers)")
+    print(f"speedup     {serialTime / concurrentTime:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
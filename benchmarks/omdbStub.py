@@ -0,0 +1,99 @@
+"""
+Local stand-in for the OMDB API
+
+Answers search (?s=) and title (?i=) requests with synthetic records after
+a fixed delay that simulates the network round trip, so OMDB code paths
+can be timed without a key or network access.
+
+Usage:
+    python benchmarks/omdbStub.py [--port 8765] [--latency 0.1]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def makeHandler(latency, results):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            time.sleep(latency)
+
+            if "s" in query:
+                name = query["s"][0]
+                body = {
+                    "Response": "True",
+                    "totalResults": str(results),
+                    "Search": [
+                        {
+                            "imdbID": f"tt{i:07d}",
+                            "Title": f"{name.title()} {i}",
+                            "Year": str(1990 + i),
+                            "Type": "movie",
+                            "Poster": "N/A"
+                        }
+                        for i in range(results)
+                    ]
+                }
+            elif "i" in query:
+                imdbID = query["i"][0]
+                body = {
+                    "Response": "True",
+                    "imdbID": imdbID,
+                    "Title": f"Title {imdbID}",
+                    "Plot": "A hero sets out on a long journey and learns what matters.",
+                    "Genre": "Adventure, Drama",
+                    "Actors": "Jane Doe, John Roe",
+                    "Director": "Sam Smith"
+                }
+            else:
+                body = {"Response": "False", "Error": "Incorrect IMDb ID."}
+
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def startStubServer(port=0, latency=0.1, results=10):
+    """
+    Serve the stub in a daemon thread
+
+    Returns:
+        tuple: (server, baseURL); call server.shutdown() to stop it
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), makeHandler(latency, results))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds added to every response")
+    parser.add_argument("--results", type=int, default=10, help="titles returned per search")
+    args = parser.parse_args()
+
+    server, baseURL = startStubServer(args.port, args.latency, args.results)
+    print(f"OMDB stub listening on {baseURL}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Result store scale benchmark
+
+Fills a ResultStore in a temporary directory with synthetic Vader results,
+--reviews per movie until --rows rows are stored, then reports the append
+rate, the time to reopen the store and the time to load one movie's
+distribution. The same distribution is also built from a JSON list of the
+movie's result dicts, the way results would be kept without the store.
+
+Usage:
+    python benchmarks/resultStoreScale.py [--rows 10000000] [--reviews 100]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregates
+import resultStore
+import results
+
+
+def syntheticResults(rng, count):
+    compound = rng.uniform(-1, 1, count).round(4)
+    return [results.Result("vader", results.compoundLabel(value), value, (0.1, 0.6, 0.3, float(value)))
+            for value in compound]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="rows to store")
+    parser.add_argument("--reviews", type=int, default=100, help="reviews per movie")
+    parser.add_argument("--lookups", type=int, default=1000, help="movies loaded after filling")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scored = syntheticResults(rng, args.reviews)
+    movies = args.rows // args.reviews
+
+    with tempfile.TemporaryDirectory() as path:
+        store = resultStore.ResultStore(path)
+        began = time.perf_counter()
+        for movie in range(movies):
+            texts = [f"review {movie} {i}" for i in range(args.reviews)]
+            store.append(f"tt{movie:07d}", "vader", texts, scored)
+        filled = time.perf_counter() - began
+        print(f"append       {len(store)} rows in {filled:.1f} s ({len(store) / filled:,.0f} rows/s)")
+        print(f"size         {store.stats()['bytes'] / 2 ** 20:,.0f} MiB of columns")
+
+        began = time.perf_counter()
+        store = resultStore.ResultStore(path)
+        print(f"reopen       {(time.perf_counter() - began) * 1000:.1f} ms")
+
+        picks = rng.integers(0, movies, args.lookups)
+        began = time.perf_counter()
+        for movie in picks:
+            aggregate = store.aggregate(f"tt{movie:07d}", "vader")
+        loaded = (time.perf_counter() - began) / args.lookups
+        print(f"load         {loaded * 1e6:.0f} us per movie ({aggregate.total} reviews)")
+
+        began = time.perf_counter()
+        counts = aggregates.SentimentAggregate().updateCodes(list(results.Label), store.column("label"),
+                                                             store.column("score")).counts()
+        counts = {results.labelName(label, "vader"): count for label, count in counts.items()}
+        print(f"full scan    {(time.perf_counter() - began) * 1000:.0f} ms for {counts}")
+
+    payload = json.dumps([result.toDict() for result in scored])
+    began = time.perf_counter()
+    for _ in range(args.lookups):
+        rows = json.loads(payload)
+        aggregate = aggregates.SentimentAggregate()
+        aggregate._updateIds(aggregate._labelIds([row["label"] for row in rows]),
+                             np.array([row["score"] for row in rows]))
+    parsed = (time.perf_counter() - began) / args.lookups
+    print(f"json         {parsed * 1e6:.0f} us per movie")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Benchmark harness for the analyzers, the OMDB path and the image pipeline
+
+Measures, on fixed inputs from benchmarks/corpus.py:
+  - throughput and p50/p95/p99 batch latency of every text backend across
+    batch sizes, with the result cache disabled
+  - per-image latency of imageEmotion
+  - cold-start import time of modals
+  - OMDB detail fan-out against the local stub server
+  - compare-all mode (modals.analyzeAll) against running each backend alone
+
+Results are written as JSON; compare two runs with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run.py --output bench.json [--texts 512] [--batch-sizes 1 8 32 128]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import modals
+import omdbClient
+from corpus import corpus, syntheticImages
+from omdbFanout import concurrentFetch, serialFetch
+from omdbStub import startStubServer
+from startup import SCENARIOS, timeScenario
+
+TEXT_BACKENDS = ["Flair", "TextBlob", "Vader", "Text2emotion"]
+
+
+def summarize(latencies, items):
+    """Latency percentiles in milliseconds and items per second"""
+    latencies = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        "throughput": items / latencies.sum() if latencies.sum() else 0.0,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "calls": len(latencies)
+    }
+
+
+def benchText(backend, texts, batchSizes):
+    if backend == "Flair" and not modals.FLAIR_AVAILABLE:
+        return {"skipped": "flair is not installed"}
+
+    try:
+        # Loading is measured by the cold-start benchmark, not here
+        modals.getModel(backend.lower())
+        modals.analyzeBatch(texts[:4], backend, useCache=False)
+    except Exception as e:
+        return {"skipped": str(e)}
+
+    results = {}
+    for batchSize in batchSizes:
+        latencies = []
+        for start in range(0, len(texts), batchSize):
+            batch = texts[start:start + batchSize]
+            began = time.perf_counter()
+            modals.analyzeBatch(batch, backend, batchSize=batchSize, useCache=False)
+            latencies.append(time.perf_counter() - began)
+        results[str(batchSize)] = summarize(latencies, len(texts))
+    return results
+
+
+def benchImages(images):
+    if not modals.FER_AVAILABLE:
+        return {"skipped": "fer is not installed"}
+
+    modals.imageEmotion(images[0])
+    latencies = []
+    for image in images:
+        began = time.perf_counter()
+        modals.imageEmotion(image)
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, len(images))
+
+
+def benchColdStart(runs):
+    results = {}
+    for name, code in SCENARIOS.items():
+        timings = timeScenario(code, runs)
+        results[name] = {"median": float(np.median(timings) * 1000), "min": min(timings) * 1000}
+    return results
+
+
+def benchOmdb(latency, hits, workers):
+    server, baseURL = startStubServer(latency=latency, results=hits)
+    client = omdbClient.OmdbClient(baseURL, "stub", maxWorkers=workers, rate=0)
+    try:
+        began = time.perf_counter()
+        serialFetch(baseURL, "star")
+        serial = time.perf_counter() - began
+
+        began = time.perf_counter()
+        concurrentFetch(client, "star")
+        concurrent = time.perf_counter() - began
+    finally:
+        server.shutdown()
+
+    return {"serial": serial * 1000, "concurrent": concurrent * 1000, "speedup": serial / concurrent}
+
+
+def benchCompare(texts, repeats=5):
+    backends = []
+    for backend in modals.availableBackends():
+        try:
+            modals.getModel(backend)
+            backends.append(backend)
+        except Exception as e:
+            print(f"compare: skipping {backend}: {e}", file=sys.stderr)
+    if not backends:
+        return {"skipped": "no backend could be loaded"}
+
+    def median(run):
+        timings = []
+        for _ in range(repeats):
+            began = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - began)
+        return float(np.median(timings))
+
+    alone = {backend: median(lambda: modals.analyzeBatch(texts, backend, useCache=False)) for backend in backends}
+    inProcess = median(lambda: modals.analyzeAll(texts, backends, useCache=False))
+
+    # One worker process per backend; pools start outside the timing
+    modals.analyzeAll(texts[:4], backends, workers=1)
+    processes = median(lambda: modals.analyzeAll(texts, backends, workers=1))
+
+    sequential = sum(alone.values())
+    return {
+        "sequential": sequential * 1000,
+        "slowest": max(alone.values()) * 1000,
+        "inProcess": inProcess * 1000,
+        "processes": processes * 1000,
+        "inProcessSpeedup": sequential / inProcess,
+        "processSpeedup": sequential / processes
+    }
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench.json", help="JSON results file")
+    parser.add_argument("--texts", type=int, default=512, help="texts scored per backend and batch size")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--images", type=int, default=8, help="images for the image pipeline")
+    parser.add_argument("--startup-runs", type=int, default=3, help="fresh interpreters per cold-start scenario")
+    parser.add_argument("--omdb-latency", type=float, default=0.05, help="stub server delay in seconds")
+    parser.add_argument("--only", nargs="+", choices=["text", "image", "startup", "omdb", "compare"],
+                        default=["text", "image", "startup", "omdb", "compare"])
+    args = parser.parse_args()
+
+    report = {"meta": metadata(), "text": {}}
+    texts = corpus(args.texts)
+
+    if "text" in args.only:
+        for backend in TEXT_BACKENDS:
+            print(f"text: {backend}", file=sys.stderr)
+            report["text"][backend] = benchText(backend, texts, args.batch_sizes)
+    if "image" in args.only:
+        print("image: imageEmotion", file=sys.stderr)
+        report["image"] = benchImages(syntheticImages(args.images))
+    if "startup" in args.only:
+        print("startup", file=sys.stderr)
+        report["startup"] = benchColdStart(args.startup_runs)
+    if "omdb" in args.only:
+        print("omdb fan-out", file=sys.stderr)
+        report["omdb"] = benchOmdb(args.omdb_latency, 10, 8)
+    if "compare" in args.only:
+        print("compare all backends", file=sys.stderr)
+        report["compare"] = benchCompare(texts)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Startup-time benchmark for modals.py
+
+Compares the cost of importing modals (models load lazily on first use)
+with importing it and loading every available model up front, which is
+what the module used to do at import time. Each measurement runs in a
+fresh interpreter so nothing is shared between runs.
+
+Usage:
+    python benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "import modals": "import modals",
+    "import modals + warmUp": "import modals; modals.warmUp(background=False)"
+}
+
+TIMER = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def timeScenario(code, runs):
+    """Run a snippet in fresh interpreters and return the timings in seconds"""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    for name, code in SCENARIOS.items():
+        timings = timeScenario(code, args.runs)
+        print(f"{name:<28} median {statistics.median(timings) * 1000:9.1f} ms"
+              f"   min {min(timings) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
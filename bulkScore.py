@@ -0,0 +1,250 @@
+"""
+Headless bulk scoring of review corpora
+
+Streams a CSV, JSONL or Parquet file in chunks through one of the modals
+backends and appends the results to a JSONL or CSV file as it goes. A
+checkpoint file next to the output records how far the run got, so an
+interrupted run picks up where it stopped when started again with the
+same arguments. Only one chunk is held in memory at a time.
+
+Usage:
+    python bulkScore.py reviews.csv scores.jsonl --backend Vader --text-column review
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+import aggregates
+import modals
+import results
+import scoringEngine
+
+
+def readCsv(path, textColumn, idColumn, chunkSize, skip):
+    import pandas as pd
+
+    columns = [textColumn] + ([idColumn] if idColumn else [])
+    reader = pd.read_csv(path, usecols=columns, chunksize=chunkSize, dtype={textColumn: str})
+    for frame in reader:
+        # Rows done by an earlier run are dropped a chunk at a time; skiprows
+        # would build a set of every skipped row number
+        if skip >= len(frame):
+            skip -= len(frame)
+            continue
+        frame = frame.iloc[skip:]
+        skip = 0
+
+        texts = frame[textColumn].fillna("").tolist()
+        ids = frame[idColumn].tolist() if idColumn else None
+        yield texts, ids
+
+
+def readJsonl(path, textColumn, idColumn, chunkSize, skip):
+    with open(path, encoding="utf-8") as file:
+        # Blank lines are not records, so they neither fail nor count as rows done
+        lines = islice((line for line in file if line.strip()), skip, None)
+        while True:
+            records = [json.loads(line) for line in islice(lines, chunkSize)]
+            if not records:
+                break
+            texts = [record.get(textColumn) or "" for record in records]
+            ids = [record.get(idColumn) for record in records] if idColumn else None
+            yield texts, ids
+
+
+def readParquet(path, textColumn, idColumn, chunkSize, skip):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Reading Parquet needs pyarrow: pip install pyarrow")
+
+    columns = [textColumn] + ([idColumn] if idColumn else [])
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunkSize, columns=columns):
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        batch = batch.slice(skip)
+        skip = 0
+
+        texts = [text or "" for text in batch.column(textColumn).to_pylist()]
+        ids = batch.column(idColumn).to_pylist() if idColumn else None
+        yield texts, ids
+
+
+READERS = {
+    ".csv": readCsv,
+    ".jsonl": readJsonl,
+    ".json": readJsonl,
+    ".parquet": readParquet
+}
+
+
+class ResultWriter:
+    """Append scored rows to a JSONL or CSV file"""
+
+    FIELDS = ["id", "label", "score", "scores"]
+
+    def __init__(self, path, offset):
+        self.isCsv = path.lower().endswith(".csv")
+        self.file = open(path, "a+b")
+        # Drop anything written after the last checkpoint
+        self.file.truncate(offset)
+        self.file.seek(offset)
+
+    def write(self, ids, results):
+        lines = []
+        for rowId, result in zip(ids, results):
+            row = {"id": rowId, **result.toDict()}
+            if self.isCsv:
+                row["scores"] = json.dumps(row["scores"])
+                lines.append(row)
+            else:
+                lines.append(json.dumps(row, default=str) + "\n")
+
+        if self.isCsv:
+            text = _csvText(lines, header=self.file.tell() == 0)
+        else:
+            text = "".join(lines)
+
+        self.file.write(text.encode("utf-8"))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def _csvText(rows, header):
+    import io
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=ResultWriter.FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def loadCheckpoint(path, inputPath, backend):
+    """Return (rowsDone, outputBytes, aggregate) recorded for this input and backend"""
+    if not os.path.exists(path):
+        return 0, 0, aggregates.SentimentAggregate()
+
+    with open(path, encoding="utf-8") as file:
+        checkpoint = json.load(file)
+
+    if checkpoint.get("input") != os.path.abspath(inputPath) or checkpoint.get("backend") != backend:
+        sys.exit(f"Checkpoint {path} belongs to another run; delete it to start over")
+    aggregate = aggregates.SentimentAggregate.fromDict(checkpoint["aggregate"]) \
+        if "aggregate" in checkpoint else aggregates.SentimentAggregate()
+    return checkpoint["rowsDone"], checkpoint["outputBytes"], aggregate
+
+
+def saveCheckpoint(path, inputPath, backend, rowsDone, outputBytes, aggregate):
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump({
+            "input": os.path.abspath(inputPath),
+            "backend": backend,
+            "rowsDone": rowsDone,
+            "outputBytes": outputBytes,
+            "aggregate": aggregate.toDict()
+        }, file)
+    os.replace(temporary, path)
+
+
+def score(inputPath, outputPath, backend, textColumn="text", idColumn=None,
+          chunkSize=1000, batchSize=modals.DEFAULT_BATCH_SIZE, useCache=False, checkpointPath=None,
+          workers=0, overwrite=False):
+    """
+    Score a corpus file into an output file, resuming from a checkpoint
+
+    With ``workers`` > 0 chunks are scored by a scoringEngine process pool
+    instead of in this process. An existing output without a checkpoint is
+    only replaced with ``overwrite``; with it, any checkpoint is discarded and
+    the run starts over.
+
+    Returns:
+        int: Total number of rows scored, including earlier runs
+    """
+    extension = os.path.splitext(inputPath)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported input format: {extension}")
+
+    checkpointPath = checkpointPath or outputPath + ".checkpoint"
+    if overwrite:
+        if os.path.exists(checkpointPath):
+            os.remove(checkpointPath)
+    elif not os.path.exists(checkpointPath) and os.path.exists(outputPath) and os.path.getsize(outputPath):
+        sys.exit(f"{outputPath} exists and has no checkpoint; pass --overwrite to replace it")
+    rowsDone, outputBytes, aggregate = loadCheckpoint(checkpointPath, inputPath, backend)
+    if rowsDone:
+        print(f"Resuming after {rowsDone} rows", file=sys.stderr)
+
+    engine = None
+    if workers:
+        # Split every input chunk across all workers
+        engine = scoringEngine.ScoringEngine(backend, workers=workers, batchSize=batchSize,
+                                             chunkSize=max(batchSize, chunkSize // workers))
+    writer = ResultWriter(outputPath, outputBytes)
+    start = time.perf_counter()
+    scored = 0
+
+    try:
+        for texts, ids in READERS[extension](inputPath, textColumn, idColumn, chunkSize, rowsDone):
+            if ids is None:
+                ids = list(range(rowsDone, rowsDone + len(texts)))
+
+            if engine is not None:
+                batch = engine.score(texts)
+            else:
+                batch = modals.analyzeBatch(texts, backend, batchSize=batchSize, useCache=useCache)
+            outputBytes = writer.write(ids, batch)
+            aggregate.update(batch)
+            rowsDone += len(texts)
+            scored += len(texts)
+            saveCheckpoint(checkpointPath, inputPath, backend, rowsDone, outputBytes, aggregate)
+
+            elapsed = time.perf_counter() - start
+            print(f"{rowsDone} rows scored ({scored / elapsed:.0f} rows/s)", file=sys.stderr)
+    finally:
+        writer.close()
+        if engine is not None:
+            for pid, rate in sorted(engine.throughput().items()):
+                print(f"worker {pid}: {rate:.0f} rows/s", file=sys.stderr)
+            engine.close()
+
+    # The aggregate lives in the checkpoint, so it covers earlier runs too
+    for label, share in aggregate.proportions().items():
+        print(f"{results.labelName(label, backend.lower())}: {share:.1%}", file=sys.stderr)
+    return rowsDone
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV, JSONL or Parquet file")
+    parser.add_argument("output", help="JSONL or CSV file results are appended to")
+    parser.add_argument("--backend", default="Vader", help="Flair, TextBlob, Vader or Text2emotion")
+    parser.add_argument("--text-column", default="text", help="column/field holding the review text")
+    parser.add_argument("--id-column", help="column/field copied to the output, row number if omitted")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows read and written at a time")
+    parser.add_argument("--batch-size", type=int, default=modals.DEFAULT_BATCH_SIZE, help="texts per model call")
+    parser.add_argument("--cache", action="store_true", help="use the result cache")
+    parser.add_argument("--workers", type=int, default=0, help="scoring processes, 0 to score in this process")
+    parser.add_argument("--checkpoint", help="checkpoint file, OUTPUT.checkpoint by default")
+    parser.add_argument("--overwrite", action="store_true", help="replace an existing output and start over")
+    args = parser.parse_args()
+
+    total = score(args.input, args.output, args.backend, args.text_column, args.id_column,
+                  args.chunk_size, args.batch_size, args.cache, args.checkpoint, args.workers,
+                  args.overwrite)
+    print(f"Done: {total} rows in {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
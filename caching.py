@@ -0,0 +1,327 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalizeText(text):
+    """Normalize text so that trivially different inputs share a cache entry"""
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def textKey(backend, version, text):
+    """
+    Build a content-addressed cache key
+
+    Args:
+        backend (str): Backend name
+        version (str): Version string of the backend's model
+        text (str): Input text, hashed after normalization
+
+    Returns:
+        str: Key of the form backend:version:sha256
+    """
+    digest = hashlib.sha256(normalizeText(text).encode("utf-8")).hexdigest()
+    return f"{backend}:{version}:{digest}"
+
+
+class ByteLRU:
+    """
+    Thread-safe LRU mapping of keys to bytes, bounded by the total size
+    of the stored values
+    """
+
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.currentBytes = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Return the stored bytes for key, or None"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store bytes under key, evicting least recently used entries"""
+        if len(value) > self.maxBytes:
+            return
+
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.currentBytes -= len(previous)
+
+            self._data[key] = value
+            self.currentBytes += len(value)
+
+            while self.currentBytes > self.maxBytes:
+                _, evicted = self._data.popitem(last=False)
+                self.currentBytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.currentBytes = 0
+
+
+class ResultCache:
+    """
+    Two-tier cache for analysis results
+
+    Values are pickled and kept in a memory-bounded LRU. When a path is
+    given, entries are also written to a SQLite database that every worker
+    process on the machine can share; memory misses fall back to it.
+    """
+
+    def __init__(self, maxBytes=64 * 1024 * 1024, path=None):
+        self.memory = ByteLRU(maxBytes)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.diskHits = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+            self._db.commit()
+
+    def _readDisk(self, keys):
+        if self._db is None or not keys:
+            return {}
+
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(part))})",
+                    part
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def getMany(self, keys):
+        """
+        Look up several keys at once
+
+        Args:
+            keys (list): Cache keys
+
+        Returns:
+            dict: key -> value for every key that was found
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = pickle.loads(value)
+
+        fromDisk = self._readDisk(missing)
+        for key, value in fromDisk.items():
+            self.memory.put(key, value)
+            found[key] = pickle.loads(value)
+
+        with self._lock:
+            self.diskHits += len(fromDisk)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key, default=None):
+        return self.getMany([key]).get(key, default)
+
+    def putMany(self, items):
+        """
+        Store several values
+
+        Args:
+            items (dict): key -> picklable value
+        """
+        payloads = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+                    for key, value in items.items()]
+        for key, payload in payloads:
+            self.memory.put(key, payload)
+
+        if self._db is not None and payloads:
+            with self._lock:
+                self._db.executemany("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", payloads)
+                self._db.commit()
+
+    def put(self, key, value):
+        self.putMany({key: value})
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        self.memory.clear()
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the memory tier's size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "diskHits": self.diskHits,
+            "evictions": self.memory.evictions,
+            "entries": len(self.memory),
+            "bytes": self.memory.currentBytes
+        }
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded cache whose entries expire after ``ttl`` seconds
+
+    Entries older than ``ttl`` but younger than ``ttl + staleTtl`` are still
+    served while a background thread reloads them (stale-while-revalidate).
+    When a path is given, entries are written through to a shelve file and
+    survive restarts.
+    """
+
+    def __init__(self, maxsize=256, ttl=3600, staleTtl=0, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.staleTtl = staleTtl
+        self.hits = 0
+        self.staleHits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._shelf = None
+
+        if path:
+            import shelve
+
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._shelf = shelve.open(path)
+
+    def _lookup(self, key):
+        """Return (value, storedAt) for key from memory or disk, or None"""
+        entry = self._data.get(key)
+        if entry is None and self._shelf is not None:
+            entry = self._shelf.get(key)
+            if entry is not None:
+                self._data[key] = entry
+                self._evict()
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        """Drop least recently used entries beyond maxsize; call with the lock held"""
+        while len(self._data) > self.maxsize:
+            oldest, _ = self._data.popitem(last=False)
+            if self._shelf is not None:
+                self._shelf.pop(oldest, None)
+
+    def _store(self, key, value):
+        entry = (value, time.time())
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            self._evict()
+            if self._shelf is not None:
+                self._shelf[key] = entry
+                self._shelf.sync()
+
+    def _refresh(self, key, loader, cacheable):
+        try:
+            value = loader()
+            # A failed reload keeps serving the stale value
+            if cacheable is None or cacheable(value):
+                self._store(key, value)
+        except Exception:
+            # Keep serving the stale value; the next expiry retries
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key, default=None):
+        """Return a fresh or stale value without loading, or default"""
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is None or time.time() - entry[1] >= self.ttl + self.staleTtl:
+            return default
+        return entry[0]
+
+    def set(self, key, value):
+        self._store(key, value)
+
+    def getOrLoad(self, key, loader, cacheable=None):
+        """
+        Return the cached value for key, calling loader() when it is missing
+
+        Args:
+            key (str): Cache key
+            loader (callable): Produces the value; exceptions propagate and
+                nothing is cached
+            cacheable (callable): Whether a loaded value may be cached, e.g.
+                to skip error responses; every value by default
+
+        Returns:
+            object: The cached or freshly loaded value
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            age = None if entry is None else time.time() - entry[1]
+
+            if age is not None and age < self.ttl:
+                self.hits += 1
+                return entry[0]
+
+            if age is not None and age < self.ttl + self.staleTtl:
+                self.staleHits += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, loader, cacheable), daemon=True).start()
+                return entry[0]
+
+            self.misses += 1
+
+        value = loader()
+        if cacheable is None or cacheable(value):
+            self._store(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self._shelf is not None:
+                self._shelf.clear()
+                self._shelf.sync()
+
+    def stats(self):
+        """Return hit/stale-hit/miss counters and the number of entries"""
+        return {
+            "hits": self.hits,
+            "staleHits": self.staleHits,
+            "misses": self.misses,
+            "entries": len(self._data)
+        }
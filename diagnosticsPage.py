@@ -0,0 +1,47 @@
+import streamlit as st
+import streamlit.components.v1 as components
+import pandas as pd
+import instrumentation
+
+
+def renderPage():
+    """Main page rendering function"""
+    st.title("Diagnostics 🩺")
+    components.html("""<hr style="height:3px;border:none;color:#333;background-color:#333; margin-bottom: 10px" /> """)
+    
+    st.subheader("Per-stage timings")
+    st.text("Time spent in model loading, inference, OMDB requests, decoding and rendering in this process.")
+    
+    metrics = instrumentation.snapshot()
+    
+    if metrics["spans"]:
+        spans = pd.DataFrame.from_dict(metrics["spans"], orient="index")
+        spans[["total", "mean", "p50", "p95", "max"]] *= 1000
+        spans = spans.rename(columns={
+            "total": "total (ms)", "mean": "mean (ms)", "p50": "p50 (ms)", "p95": "p95 (ms)", "max": "max (ms)"
+        })
+        st.dataframe(spans.sort_values("total (ms)", ascending=False).round(2), use_container_width=True)
+    else:
+        st.info("No timings recorded yet. Use the other pages first.")
+    
+    collectors = metrics["collectors"]
+    batching = {name: stats for name, stats in collectors.items() if "batch." in name}
+    caches = {name: stats for name, stats in collectors.items() if name not in batching}
+    
+    st.subheader("Caches")
+    if caches:
+        st.dataframe(pd.DataFrame.from_dict(caches, orient="index"), use_container_width=True)
+    
+    if batching:
+        st.subheader("Micro-batching")
+        st.text("Texts from concurrent sessions scored together; waits are in seconds.")
+        st.dataframe(pd.DataFrame.from_dict(batching, orient="index"), use_container_width=True)
+    
+    if metrics["counters"]:
+        st.subheader("Counters")
+        st.dataframe(pd.Series(metrics["counters"], name="value"), use_container_width=True)
+    
+    with st.expander("Prometheus export"):
+        text = instrumentation.renderPrometheus()
+        st.code(text, language="text")
+        st.download_button("Download metrics", text, file_name="metrics.txt", mime="text/plain")
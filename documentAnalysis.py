@@ -0,0 +1,211 @@
+"""
+Sentence and window level analysis of long documents
+
+A document is split into chunks, every chunk of every document is scored in
+one modals.analyzeBatch call, and the chunk scores are folded back into one
+result per document. Chunks are whole sentences packed up to ``maxTokens``
+whitespace tokens; a sentence longer than that is cut into windows of
+``maxTokens`` tokens overlapping by ``overlap``. Smaller chunks cost less per
+model call and follow sentiment shifts inside a review, larger ones give the
+model more context.
+"""
+import re
+
+import numpy as np
+
+import modals
+from results import FIELDS, Result, compoundLabel, emotionLabel, flairLabel, polarityLabel
+
+# Sentence boundary: terminal punctuation, optional closing quotes or
+# brackets, then whitespace, or a blank line
+_SENTENCE_END = re.compile(r'(?<=[.!?…])["\')\]]*\s+|\n\s*\n')
+
+# Default chunk size and window overlap, in whitespace tokens
+MAX_TOKENS = 64
+OVERLAP = 16
+
+
+def splitSentences(text):
+    """Split text into sentences on terminal punctuation and blank lines"""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence and sentence.strip()]
+
+
+def windows(tokens, maxTokens=MAX_TOKENS, overlap=OVERLAP):
+    """Cut a token list into windows of maxTokens overlapping by overlap"""
+    if len(tokens) <= maxTokens:
+        return [tokens]
+    step = max(1, maxTokens - overlap)
+    return [tokens[start:start + maxTokens]
+            for start in range(0, len(tokens) - overlap, step)]
+
+
+def chunkText(text, mode="sentence", maxTokens=MAX_TOKENS, overlap=OVERLAP):
+    """
+    Split a document into chunks to score
+
+    Args:
+        text (str): Document
+        mode (str): "sentence" packs whole sentences up to maxTokens,
+            "window" ignores sentences and cuts fixed token windows
+        maxTokens (int): Largest chunk, in whitespace tokens
+        overlap (int): Tokens shared by consecutive windows
+
+    Returns:
+        list: Chunk strings, at least one per document
+    """
+    if mode == "window":
+        chunks = [" ".join(window) for window in windows(text.split(), maxTokens, overlap)]
+        return chunks if chunks[0] else [text]
+    if mode != "sentence":
+        raise ValueError(f"Unknown chunking mode: {mode}")
+
+    chunks = []
+    current = []
+    for sentence in splitSentences(text):
+        tokens = sentence.split()
+        if len(tokens) > maxTokens:
+            if current:
+                chunks.append(" ".join(current))
+                current = []
+            chunks.extend(" ".join(window) for window in windows(tokens, maxTokens, overlap))
+        elif len(current) + len(tokens) > maxTokens:
+            chunks.append(" ".join(current))
+            current = tokens
+        else:
+            current = current + tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks or [text]
+
+
+def _polarity(result, key):
+    """Signed sentiment of a chunk result in [-1, 1]"""
+    if key == "flair":
+        return result.get("POSITIVE", 0.5) - result.get("NEGATIVE", 0.5)
+    if key == "textblob":
+        return result.get("polarity")
+    if key == "vader":
+        return result.get("compound")
+    raise ValueError(f"{key} has no polarity")
+
+
+def _weightedMean(values, weights):
+    return float(np.average(values, weights=weights)) if weights.sum() else float(np.mean(values))
+
+
+def _documentResult(key, results, weights, aggregate):
+    """Fold chunk results into one document result"""
+    if key == "text2emotion":
+        emotions = FIELDS[key]
+        matrix = np.array([result.scores for result in results])
+        if aggregate == "max":
+            values = matrix.max(axis=0)
+        elif aggregate in ("weightedMean", "maxNegative", "extreme"):
+            # Emotions have no polarity, polarity aggregates average them
+            values = np.average(matrix, axis=0, weights=weights) if weights.sum() else matrix.mean(axis=0)
+        else:
+            raise ValueError(f"Unknown aggregate: {aggregate}")
+        emotion = {name: round(float(value), 2) for name, value in zip(emotions, values)}
+        label, secondary = emotionLabel(emotion)
+        return Result.fromScores(key, label, max(emotion.values()), emotion, secondary)
+
+    polarities = np.array([_polarity(result, key) for result in results])
+    if aggregate == "weightedMean":
+        polarity = _weightedMean(polarities, weights)
+    elif aggregate == "maxNegative":
+        # A single clearly negative passage decides the document
+        polarity = float(polarities.min())
+    elif aggregate == "extreme":
+        polarity = float(polarities[np.argmax(np.abs(polarities))])
+    else:
+        raise ValueError(f"Unknown aggregate: {aggregate}")
+
+    if key == "flair":
+        positive = (polarity + 1) / 2
+        value = "POSITIVE" if positive >= 0.5 else "NEGATIVE"
+        confidence = max(positive, 1 - positive)
+        return Result(key, flairLabel(value, confidence), confidence, (positive, 1 - positive))
+    if key == "textblob":
+        polarity = round(polarity, 2)
+        return Result.fromScores(key, polarityLabel(polarity), polarity, {"polarity": polarity})
+    return Result.fromScores(key, compoundLabel(polarity), polarity, {"compound": polarity})
+
+
+def _fold(key, chunked, scored, aggregate, withChunks=False):
+    """Split flat chunk results back per document and aggregate each"""
+    documents = []
+    start = 0
+    for chunks in chunked:
+        results = scored[start:start + len(chunks)]
+        start += len(chunks)
+
+        if len(chunks) == 1:
+            document = results[0]
+        else:
+            weights = np.array([len(chunk.split()) for chunk in chunks], dtype=np.float64)
+            document = _documentResult(key, results, weights, aggregate)
+        documents.append((document, list(zip(chunks, results))) if withChunks else document)
+
+    return documents
+
+
+def analyzeDocuments(texts, backend, mode="sentence", maxTokens=MAX_TOKENS, overlap=OVERLAP,
+                     aggregate="weightedMean", batchSize=modals.DEFAULT_BATCH_SIZE, scorer=None,
+                     withChunks=False):
+    """
+    Score long documents chunk by chunk
+
+    Args:
+        texts (list): Documents
+        backend (str): Package name (Flair/TextBlob/Vader/Text2emotion)
+        mode (str): Chunking mode, "sentence" or "window"
+        maxTokens (int): Largest chunk, in whitespace tokens
+        overlap (int): Tokens shared by consecutive windows
+        aggregate (str): "weightedMean" (by chunk length), "maxNegative"
+            (most negative chunk) or "extreme" (strongest chunk); for
+            text2emotion "max" (per emotion) or any other for the weighted mean
+        batchSize (int): Chunks handed to the backend at once
+        scorer (callable): Replaces modals.analyzeBatch, called with the list
+            of all chunks, e.g. a ScoringEngine's score method
+        withChunks (bool): Also return every chunk's text and result
+
+    Returns:
+        list: One results.Result per document, or with withChunks a
+        (result, [(chunk text, chunk result), ...]) pair per document
+    """
+    key = backend.lower()
+    if key not in modals.BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+
+    chunked = [chunkText(text, mode, maxTokens, overlap) for text in texts]
+    flat = [chunk for chunks in chunked for chunk in chunks]
+    if scorer is None:
+        scored = modals.analyzeBatch(flat, backend, batchSize=batchSize)
+    else:
+        scored = scorer(flat)
+
+    return _fold(key, chunked, scored, aggregate, withChunks)
+
+
+def compareDocuments(texts, backends=None, mode="sentence", maxTokens=MAX_TOKENS, overlap=OVERLAP,
+                     aggregate="weightedMean", batchSize=modals.DEFAULT_BATCH_SIZE, workers=0):
+    """
+    Score documents with several backends at once
+
+    Documents are chunked once and every backend scores the same chunks
+    concurrently through modals.analyzeAll.
+
+    Args:
+        texts (list): Documents
+        backends (list): Package names, every available backend if None
+        mode, maxTokens, overlap, aggregate, batchSize: As in analyzeDocuments
+        workers (int): Worker processes per backend, see modals.analyzeAll
+
+    Returns:
+        dict: Lower-cased backend name -> one document result per text
+    """
+    chunked = [chunkText(text, mode, maxTokens, overlap) for text in texts]
+    flat = [chunk for chunks in chunked for chunk in chunks]
+    scoredByBackend = modals.analyzeAll(flat, backends, batchSize=batchSize, workers=workers)
+
+    return {key: _fold(key, chunked, scored, aggregate) for key, scored in scoredByBackend.items()}
@@ -0,0 +1,167 @@
+"""
+Batch emotion scoring compatible with text2emotion
+
+text2emotion rebuilds its 8,700-word lexicon inside get_emotion on every
+call and looks each token up with list.index. It also lemmatizes every
+token and filters stop words against a freshly built list of all of
+NLTK's languages. This engine reads the same lexicon, emoji, negation and
+shortcut tables once from the installed text2emotion source, without
+importing it. It compiles them into a hash table from token to a row of a
+NumPy one-hot emotion matrix and accumulates a whole batch with one
+bincount.
+
+Parity: the cleaning steps mirror text2emotion's, except that NLTK's
+Punkt/Treebank word_tokenize is replaced by a regular expression that
+splits words, hyphenated words, 's-style clitics and punctuation the same
+way for ordinary prose. Reported distributions match text2emotion's
+exactly for most texts and stay within TOLERANCE per emotion otherwise;
+benchmarks/emotionParity.py measures this against the library.
+"""
+import ast
+import importlib.util
+import re
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+# Emotions in the order text2emotion reports them
+EMOTIONS = ("Happy", "Angry", "Surprise", "Sad", "Fear")
+
+# Largest per-emotion difference from text2emotion.get_emotion
+TOLERANCE = 0.1
+
+_URL = re.compile(r'http\S+|www.\S+')
+_NOT_PHRASE = re.compile(r"not\s\w+")
+_TOKEN = re.compile(r"\w+(?:[-']\w+)*|'\w+|[^\w\s]+")
+
+
+def _readTables():
+    """Pull the lexicon and helper tables out of text2emotion's source"""
+    spec = importlib.util.find_spec("text2emotion")
+    if spec is None or spec.origin is None:
+        raise ImportError("text2emotion is not installed")
+
+    with open(spec.origin, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+
+    tables = {}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id in ("df", "emoj", "d", "shortcuts")):
+            tables[node.targets[0].id] = ast.literal_eval(node.value)
+    return tables
+
+
+class EmotionEngine:
+    """Compiled text2emotion lexicon with vectorized batch scoring"""
+
+    def __init__(self):
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+
+        tables = _readTables()
+        lexicon = tables["df"]
+
+        # text2emotion takes the first occurrence of a word, and its
+        # `if a:` check ignores the word at index 0 entirely. Multi-word
+        # entries can never equal a single token.
+        words, emotions = lexicon["Word"], lexicon["Emotion"]
+        emotionIds = {emotion: i for i, emotion in enumerate(EMOTIONS)}
+        seen = {words[0]}
+        self.index = {}
+        rows = []
+        for word, emotion in zip(words[1:], emotions[1:]):
+            if word in seen or " " in word:
+                continue
+            seen.add(word)
+            self.index[word] = len(rows)
+            rows.append(emotionIds[emotion])
+        self.rowEmotion = np.asarray(rows, dtype=np.int64)
+
+        self.emoji = {}
+        for symbol, emotion in zip(tables["emoj"]["Emoji"], tables["emoj"]["Emotion"]):
+            if len(symbol) == 1:
+                self.emoji.setdefault(symbol, emotion)
+        self.negations = tables["d"]
+        self.shortcuts = tables["shortcuts"]
+
+        self.stopwords = frozenset(stopwords.words())
+        self._lemmatizer = WordNetLemmatizer()
+        self._lemmaLock = threading.Lock()
+
+    @lru_cache(maxsize=65536)
+    def _lemma(self, word):
+        # WordNet's lazy loader is not safe to initialize from several threads
+        with self._lemmaLock:
+            word = self._lemmatizer.lemmatize(word, 'v')
+            return self._lemmatizer.lemmatize(word, 'n')
+
+    def tokens(self, text):
+        """Clean and lemmatize a text the way text2emotion does"""
+        text = text.lower()
+        text = "".join(f" {self.emoji[c]} " if c in self.emoji else c for c in text).lower()
+        text = _URL.sub('', text)
+
+        text = text.replace("n't", " not")
+        text = re.sub(r"ai\snot", "am not", text)
+        text = re.sub(r"wo\snot", "will not", text)
+        for phrase in _NOT_PHRASE.findall(text):
+            if phrase in self.negations:
+                text = text.replace(phrase, self.negations[phrase])
+        text = text.lower()
+
+        words = " ".join(self.shortcuts.get(token, token) for token in text.split())
+        words = " ".join(word for word in words.split() if not word.isdigit())
+
+        return [
+            self._lemma(word)
+            for word in _TOKEN.findall(words)
+            if word not in self.stopwords and len(word) > 2
+        ]
+
+    def rows(self, text):
+        """Lexicon rows matched by the tokens of a text"""
+        index = self.index
+        return [index[token] for token in self.tokens(text) if token in index]
+
+    def counts(self, texts):
+        """
+        Count matched lexicon words per emotion
+
+        Returns:
+            numpy.ndarray: (len(texts), 5) counts in EMOTIONS order
+        """
+        matched = [self.rows(text) for text in texts]
+        if not matched:
+            return np.zeros((0, len(EMOTIONS)), dtype=np.int64)
+
+        lengths = np.fromiter((len(rows) for rows in matched), dtype=np.int64, count=len(matched))
+        rowIds = np.fromiter((row for rows in matched for row in rows), dtype=np.int64, count=int(lengths.sum()))
+        docIds = np.repeat(np.arange(len(matched)), lengths)
+
+        flat = docIds * len(EMOTIONS) + self.rowEmotion[rowIds]
+        counts = np.bincount(flat, minlength=len(matched) * len(EMOTIONS))
+        return counts.reshape(len(matched), len(EMOTIONS))
+
+    def distributions(self, texts):
+        """
+        Emotion distributions as text2emotion reports them
+
+        Returns:
+            numpy.ndarray: (len(texts), 5) shares rounded to 2 decimals,
+            all zero for texts without a lexicon word
+        """
+        counts = self.counts(texts).astype(np.float64)
+        totals = counts.sum(axis=1, keepdims=True)
+        shares = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+        return np.round(shares, 2)
+
+    def getEmotions(self, texts):
+        """Drop-in batch replacement for text2emotion.get_emotion"""
+        return [dict(zip(EMOTIONS, row)) for row in self.distributions(texts).tolist()]
+
+    def getEmotion(self, text):
+        """Drop-in replacement for text2emotion.get_emotion"""
+        return self.getEmotions([text])[0]
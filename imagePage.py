@@ -3,8 +3,18 @@ import streamlit.components.v1 as components
 from PIL import Image
 import numpy as np
 import cv2
+import hashlib
+import io
 import json
+import os
+import pickle
+import tempfile
+import time
+import pandas as pd
 import modals
+import caching
+import instrumentation
+import videoAnalysis
 
 # Emoji mapping for emotions
 getEmoji = {
@@ -17,12 +27,74 @@ getEmoji = {
     "angry": "😠",
 }
 
+# Detections, face crops and the annotated image of recent uploads, keyed by
+# a hash of the uploaded bytes so reruns on the same image skip decoding and
+# the detector. IMAGE_CACHE_BYTES bounds the encoded size kept in memory
+imageCache = caching.ByteLRU(int(os.environ.get("IMAGE_CACHE_BYTES", 64 * 1024 * 1024)))
+instrumentation.registerCollector("cache.images", lambda: {
+    "evictions": imageCache.evictions,
+    "entries": len(imageCache),
+    "bytes": imageCache.currentBytes
+})
 
-def showEmotionData(emotion, topEmotion, image, idx):
-    """Display emotion data for a detected person"""
-    x, y, w, h = tuple(emotion["box"])
-    cropImage = image[y:y+h, x:x+w]
+
+def encodeImage(image):
+    """Encode an RGB(A) array as JPEG, or PNG when it has an alpha channel"""
+    buffer = io.BytesIO()
+    picture = Image.fromarray(image)
+    if picture.mode == "RGB":
+        picture.save(buffer, format="JPEG", quality=90)
+    else:
+        picture.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def analyzeUpload(data):
+    """
+    Decode an uploaded image and detect the emotions of its faces, cached by
+    a hash of the bytes
+    
+    Args:
+        data (bytes): Uploaded file content
+        
+    Returns:
+        dict: shape, emotions and topEmotion as returned by
+        modals.imageEmotion, the encoded crop of each face (None when its
+        box is empty) and the encoded annotated image, None without faces
+    """
+    key = hashlib.sha256(data).hexdigest()
+    cached = imageCache.get(key)
+    if cached is not None:
+        instrumentation.increment("cache.images.hits")
+        return pickle.loads(cached)
+    instrumentation.increment("cache.images.misses")
+    
+    # Decode once; the array is reused for analysis and crops
+    with instrumentation.span("decode.image"):
+        content = np.array(Image.open(io.BytesIO(data)))  # PIL to numpy array
     
+    # Images with a bit-depth below 24 are rejected by the page, not analyzed
+    analysis = {"shape": np.shape(content), "emotions": None, "topEmotion": None, "crops": [], "annotated": None}
+    if len(analysis["shape"]) >= 3:
+        emotions, topEmotion, image = modals.imageEmotion(content)
+        analysis["emotions"] = emotions
+        analysis["topEmotion"] = topEmotion
+        
+        with instrumentation.span("encode.image"):
+            for emotion in emotions or []:
+                x, y, w, h = tuple(emotion["box"])
+                crop = content[max(y, 0):y+h, max(x, 0):x+w]
+                analysis["crops"].append(encodeImage(crop) if crop.size else None)
+            # Nothing is drawn without faces, and the page shows no processed image then
+            if emotions:
+                analysis["annotated"] = encodeImage(image)
+    
+    imageCache.put(key, pickle.dumps(analysis, protocol=pickle.HIGHEST_PROTOCOL))
+    return analysis
+
+
+def showEmotionData(emotion, topEmotion, cropImage, idx):
+    """Display emotion data for a detected person from its encoded face crop"""
     keys = list(emotion["emotions"].keys())
     values = list(emotion["emotions"].values())
     emotions = sorted(emotion["emotions"].items(), key=lambda kv: (kv[1], kv[0]))
@@ -36,7 +108,8 @@ def showEmotionData(emotion, topEmotion, image, idx):
     col1, col2, col3 = st.columns([3, 1, 2])
     
     with col1:
-        st.image(cropImage, width=200)
+        if cropImage is not None:
+            st.image(cropImage, width=200)
     
     with col2:
         st.metric(f"{keys[0].capitalize()} {getEmoji.get(keys[0], '')}", round(values[0], 2))
@@ -81,35 +154,29 @@ def printImageInfoHead():
     """, height=100)
 
 
-def load_image(image_file):
-    """Load and return PIL image"""
-    image = Image.open(image_file, 'r')
-    return image
-
-
 def uploadFile():
     """Handle file upload and emotion analysis"""
     uploaded_file = st.file_uploader("Upload an image", type=["png", "jpg", "jpeg"])
     
     if uploaded_file is not None:
         try:
-            content = Image.open(uploaded_file)
-            content = np.array(content)  # PIL to numpy array
+            # Check if FER is available before decoding or caching anything
+            if not modals.FER_AVAILABLE:
+                st.warning("⚠️ FER (Facial Emotion Recognition) library is not installed. Image emotion detection is disabled.")
+                st.info("To enable image emotion detection, install FER: `pip install fer`")
+                return
+            
+            # Decoded and analyzed once per distinct upload; reruns read the cache
+            data = uploaded_file.getvalue()
+            analysis = analyzeUpload(data)
             
             # Check image dimensions
-            shape = np.shape(content)
-            if len(shape) < 3:
+            if len(analysis["shape"]) < 3:
                 st.error('Your image has a bit-depth less than 24. Please upload an image with a bit-depth of 24.')
                 return
             
-            # Analyze emotions
-            emotions, topEmotion, image = modals.imageEmotion(content)
-            
-            # Check if FER is available
-            if not modals.FER_AVAILABLE:
-                st.warning("⚠️ FER (Facial Emotion Recognition) library is not installed. Image emotion detection is disabled.")
-                st.info("To enable image emotion detection, install FER: `pip install fer`")
-                return
+            emotions = analysis["emotions"]
+            topEmotion = analysis["topEmotion"]
             
             # Display file information
             file_details = {
@@ -124,7 +191,7 @@ def uploadFile():
             
             st.text("")
             st.subheader("Original Image")
-            st.image(load_image(uploaded_file), caption=uploaded_file.name, width=250)
+            st.image(data, caption=uploaded_file.name, width=250)
             
             # Handle results
             if emotions is not None and len(emotions) == 0:
@@ -136,11 +203,9 @@ def uploadFile():
                 
                 with st.expander("Expand to see individual results"):
                     st.write("")
-                    contentcopy = Image.open(uploaded_file)
-                    contentcopy = np.array(contentcopy)
                     
                     for i in range(len(emotions)):
-                        showEmotionData(emotions[i], topEmotion, contentcopy, i + 1)
+                        showEmotionData(emotions[i], topEmotion, analysis["crops"][i], i + 1)
                 
                 st.write("")
                 st.write("")
@@ -150,7 +215,7 @@ def uploadFile():
                 
                 with col1:
                     st.subheader("Processed Image")
-                    st.image(image, width=300)
+                    st.image(analysis["annotated"], width=300)
                 
                 with col2:
                     st.metric("Top Emotion", f"{topEmotion[0].capitalize()} {getEmoji.get(topEmotion[0], '')}")
@@ -161,6 +226,80 @@ def uploadFile():
             st.info("Please make sure you uploaded a valid image file.")
 
 
+def uploadVideo():
+    """Handle video upload and stream per-face emotion timelines"""
+    uploaded_file = st.file_uploader("Upload a video", type=["mp4", "avi", "mov", "mkv"])
+    
+    if uploaded_file is None:
+        return
+    
+    if not modals.FER_AVAILABLE:
+        st.warning("⚠️ FER (Facial Emotion Recognition) library is not installed. Video emotion detection is disabled.")
+        st.info("To enable video emotion detection, install FER: `pip install fer`")
+        return
+    
+    keyframeInterval = st.slider("Analyzed frames between face detections", 1, 60, 15)
+    
+    if not st.button('Analyze'):
+        return
+    
+    # OpenCV reads from a path, so the upload is spooled to a temporary file
+    suffix = os.path.splitext(uploaded_file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as file:
+        file.write(uploaded_file.getbuffer())
+        path = file.name
+    
+    try:
+        fps, frameCount = videoAnalysis.videoInfo(path)
+        
+        printResultHead()
+        progress = st.progress(0.0)
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            framePlaceholder = st.empty()
+        with col2:
+            timelines = st.container()
+        
+        charts = {}
+        rows = {}
+        updates = []
+        start = time.perf_counter()
+        
+        for update in videoAnalysis.analyzeVideo(path, keyframeInterval=keyframeInterval):
+            updates.append({key: value for key, value in update.items() if key != "image"})
+            progress.progress(min(1.0, (update["frame"] + 1) / max(frameCount, 1)))
+            
+            if not update["keyframe"]:
+                continue
+            
+            framePlaceholder.image(update["image"], channels="BGR", caption=f"{update['time']:.1f}s")
+            
+            for face in update["faces"]:
+                if face["id"] not in charts:
+                    with timelines:
+                        st.caption(f"Person detected {face['id']}")
+                        charts[face["id"]] = st.empty()
+                    rows[face["id"]] = []
+                
+                rows[face["id"]].append({"time": update["time"], **face["emotions"]})
+                charts[face["id"]].line_chart(pd.DataFrame(rows[face["id"]]).set_index("time"))
+        
+        summary = videoAnalysis.summarize(updates, fps, time.perf_counter() - start)
+        progress.progress(1.0)
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Analyzed frames", summary["analyzedFrames"])
+        col2.metric("Keyframes", summary["keyframes"])
+        col3.metric("Speed", f"{summary['realTimeFactor']:.1f}x real time")
+        
+        if not summary["faces"]:
+            st.warning("No faces found in the video!")
+    except Exception as e:
+        st.error(f"Error processing video: {str(e)}")
+    finally:
+        os.remove(path)
+
+
 def renderPage():
     """Main page rendering function"""
     st.title("Sentiment Analysis 🎭")
@@ -170,10 +309,16 @@ def renderPage():
     st.text("Upload an image and let's find emotions in the faces detected.")
     st.text("")
     
+    # Start loading the face detector while the user picks a file
+    if modals.FER_AVAILABLE:
+        modals.warmUp(["fer"])
+    
     option = st.selectbox(
         'How would you like to provide an image?',
-        ('Upload One',)
+        ('Upload One', 'Upload Video')
     )
     
     if option == "Upload One":
         uploadFile()
+    elif option == "Upload Video":
+        uploadVideo()
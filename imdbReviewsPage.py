@@ -1,54 +1,144 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import requests
-import json
-import pandas as pd
+import logging
+import os
 import plotly.graph_objects as go
 import modals
+import caching
+import omdbClient
+import scoringEngine
+import instrumentation
+import documentAnalysis
+import aggregates
+import resultStore
+import movieCatalogue
+from results import Label, labelName
+
+logger = logging.getLogger(__name__)
 
 # OMDB API configuration
 baseURL = 'http://www.omdbapi.com'
 apiKey = '38a7a5fd'  # Your OMDB API key
 
+# Shared keep-alive client; OMDB_CONCURRENCY bounds parallel detail requests
+omdb = omdbClient.OmdbClient(
+    baseURL, apiKey,
+    maxWorkers=int(os.environ.get("OMDB_CONCURRENCY", 8))
+)
+
+# Worker processes scoring reviews; 0 scores in the Streamlit process
+scoringWorkers = int(os.environ.get("SCORING_WORKERS", 0))
+
+# Reviews are scored in chunks of at most this many tokens and the chunk
+# scores combined with DOCUMENT_AGGREGATE, instead of truncating long reviews
+documentMaxTokens = int(os.environ.get("DOCUMENT_MAX_TOKENS", documentAnalysis.MAX_TOKENS))
+documentAggregate = os.environ.get("DOCUMENT_AGGREGATE", "weightedMean")
+
+# Local title catalogue built with movieCatalogue.py; searches are answered
+# from it and only go to OMDB when it has no match
+_catalogueDir = os.environ.get("OMDB_CATALOGUE_DIR")
+catalogue = movieCatalogue.MovieCatalogue(_catalogueDir) if _catalogueDir else None
+
+# Review results of every scored movie, kept on disk in RESULT_STORE_DIR so
+# later searches read a movie's distribution instead of rescoring it
+_storeDir = os.environ.get("RESULT_STORE_DIR")
+storedResults = resultStore.ResultStore(_storeDir) if _storeDir else None
+if storedResults is not None:
+    instrumentation.registerCollector("store.results", storedResults.stats)
+
+# Package option running every available backend side by side
+COMPARE_ALL = "Compare all"
+
+# Display names of the backends keyed by modals.BACKENDS names
+BACKEND_NAMES = {
+    "flair": "Flair",
+    "textblob": "TextBlob",
+    "vader": "Vader",
+    "text2emotion": "Text2emotion"
+}
+
 # Emoji mapping for emotions/sentiments
 getEmoji = {
-    "happy": "😊",
-    "neutral": "😐",
-    "sad": "😢",
-    "disgust": "🤢",
-    "surprise": "😲",
-    "fear": "😨",
-    "angry": "😠",
-    "positive": "😊",
-    "negative": "😞",
-    "POSITIVE": "😊",
-    "NEGATIVE": "😞",
-    "NEUTRAL": "😐"
+    Label.HAPPY: "😊",
+    Label.NEUTRAL: "😐",
+    Label.SAD: "😢",
+    Label.SURPRISE: "😲",
+    Label.FEAR: "😨",
+    Label.ANGRY: "😠",
+    Label.POSITIVE: "😊",
+    Label.NEGATIVE: "😞",
+    Label.UNAVAILABLE: "😐"
 }
 
-# Cache for API responses
-lastSearched = ""
-cacheData = {}
+# Parsed OMDB responses, keyed by normalized query and by imdbID. Set
+# OMDB_CACHE_DIR to keep them on disk across restarts
+_cacheDir = os.environ.get("OMDB_CACHE_DIR")
+searchCache = caching.TTLCache(
+    maxsize=512, ttl=60 * 60, staleTtl=24 * 60 * 60,
+    path=os.path.join(_cacheDir, "search") if _cacheDir else None
+)
+detailsCache = caching.TTLCache(
+    maxsize=4096, ttl=24 * 60 * 60, staleTtl=7 * 24 * 60 * 60,
+    path=os.path.join(_cacheDir, "details") if _cacheDir else None
+)
+instrumentation.registerCollector("cache.omdbSearch", searchCache.stats)
+instrumentation.registerCollector("cache.omdbDetails", detailsCache.stats)
 
 
-def plotPie(labels, values):
+def plotPie(labels, values, key=None):
     """Create a pie chart for sentiment distribution"""
-    fig = go.Figure(
-        go.Pie(
-            labels=labels,
-            values=[value * 100 for value in values],
-            hoverinfo="label+percent",
-            textinfo="value"
+    with instrumentation.span("render.plotly"):
+        fig = go.Figure(
+            go.Pie(
+                labels=labels,
+                values=[value * 100 for value in values],
+                hoverinfo="label+percent",
+                textinfo="value"
+            )
         )
-    )
-    st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def plotAgreement(names, matrix, key=None):
+    """Create a heatmap of how often each pair of backends agrees"""
+    with instrumentation.span("render.plotly"):
+        fig = go.Figure(
+            go.Heatmap(
+                z=matrix,
+                x=names,
+                y=names,
+                zmin=0,
+                zmax=1,
+                colorscale="Blues",
+                text=[[f"{value:.0%}" for value in row] for row in matrix],
+                texttemplate="%{text}",
+                hoverinfo="skip"
+            )
+        )
+        fig.update_layout(yaxis_autorange="reversed")
+        st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def isFound(response):
+    """Whether an OMDB response is a result; errors such as "Too many results" are not cached"""
+    return response.get("Response") == "True"
 
 
 def getMovies(movieName):
     """Get movies from OMDB API based on search query"""
     try:
-        response = requests.get(f'{baseURL}/?s={movieName}&apikey={apiKey}')
-        response = response.json()
+        response = None
+        if catalogue is not None:
+            with instrumentation.span("catalogue.search"):
+                response = catalogue.search(movieName)
+            instrumentation.increment("catalogue.hits" if response["Response"] == "True" else "catalogue.misses")
+        
+        if response is None or response["Response"] != "True":
+            response = searchCache.getOrLoad(
+                " ".join(movieName.lower().split()),
+                lambda: omdb.search(movieName),
+                cacheable=isFound
+            )
         
         if response.get("Response") == "True":
             movies = [
@@ -71,74 +161,64 @@ def getMovies(movieName):
         return []
 
 
-def getFirst200Words(string):
-    """Truncate string to first 200 characters"""
-    if len(string) > 200:
-        return string[:200]
-    return string
+def fetchMovieDetails(id):
+    """Get the parsed OMDB record of a title, served from cache when possible"""
+    return detailsCache.getOrLoad(id, lambda: omdb.details(id), cacheable=isFound)
 
 
-def getMovieDetails(id):
-    """Get detailed movie information from OMDB API"""
-    try:
-        response = requests.get(f'{baseURL}/?i={id}&apikey={apiKey}')
-        response = response.json()
+def buildReviews(response):
+    """Build sample review texts from an OMDB title record"""
+    if response.get("Response") == "True":
+        # Create sample reviews from movie details
+        plot = response.get("Plot", "")
+        genre = response.get("Genre", "")
+        actors = response.get("Actors", "")
+        director = response.get("Director", "")
         
-        if response.get("Response") == "True":
-            # Create sample reviews from movie details
-            plot = response.get("Plot", "")
-            genre = response.get("Genre", "")
-            actors = response.get("Actors", "")
-            director = response.get("Director", "")
-            
-            # Generate sample text content for sentiment analysis
-            reviews = []
-            if plot and plot != "N/A":
-                reviews.append(f"The plot is interesting: {plot}")
-            
-            if genre and genre != "N/A":
-                reviews.append(f"Great {genre.lower()} movie with excellent storytelling")
-            
-            if actors and actors != "N/A":
-                reviews.append(f"Amazing performances by {actors}. Outstanding acting throughout.")
-            
-            if director and director != "N/A":
-                reviews.append(f"Brilliant direction by {director}. Masterful filmmaking.")
-            
-            # Add some generic positive and negative reviews for demonstration
-            reviews.extend([
-                "This movie was absolutely fantastic! Great story and characters.",
-                "One of the best films I've seen. Highly recommend.",
-                "Excellent cinematography and soundtrack. Loved every minute.",
-                "The movie was okay, nothing special but watchable.",
-                "Not bad, but could have been better. Average at best.",
-                "Disappointing. Expected more from this film."
-            ])
-            
-            return reviews[:10]  # Return first 10 reviews
-        else:
-            return []
-    except Exception as e:
-        st.error(f"Error fetching movie details: {str(e)}")
+        # Generate sample text content for sentiment analysis
+        reviews = []
+        if plot and plot != "N/A":
+            reviews.append(f"The plot is interesting: {plot}")
+        
+        if genre and genre != "N/A":
+            reviews.append(f"Great {genre.lower()} movie with excellent storytelling")
+        
+        if actors and actors != "N/A":
+            reviews.append(f"Amazing performances by {actors}. Outstanding acting throughout.")
+        
+        if director and director != "N/A":
+            reviews.append(f"Brilliant direction by {director}. Masterful filmmaking.")
+        
+        # Add some generic positive and negative reviews for demonstration
+        reviews.extend([
+            "This movie was absolutely fantastic! Great story and characters.",
+            "One of the best films I've seen. Highly recommend.",
+            "Excellent cinematography and soundtrack. Loved every minute.",
+            "The movie was okay, nothing special but watchable.",
+            "Not bad, but could have been better. Average at best.",
+            "Disappointing. Expected more from this film."
+        ])
+        
+        return reviews[:10]  # Return first 10 reviews
+    else:
         return []
 
 
-def getData(movieName):
-    """Get movie data and reviews"""
-    print("Sending request to get movies!!!!!!")
-    movies = getMovies(movieName)
-    data = []
-    
-    for movie in movies:
-        reviews = getMovieDetails(movie["id"])
-        data.append({
-            "title": movie["title"],
-            "image": movie["image"],
-            "description": movie["description"],
-            "reviews": reviews
-        })
+def buildMovie(movie, response):
+    """Combine a search hit with the reviews built from its details, or a fetch error"""
+    if isinstance(response, Exception):
+        st.error(f"Error fetching movie details: {str(response)}")
+        reviews = []
+    else:
+        reviews = buildReviews(response)
     
-    return json.dumps({"userSearch": movieName, "result": data})
+    return {
+        "id": movie["id"],
+        "title": movie["title"],
+        "image": movie["image"],
+        "description": movie["description"],
+        "reviews": reviews
+    }
 
 
 def displayMovieContent(movie):
@@ -146,7 +226,9 @@ def displayMovieContent(movie):
     col1, col2 = st.columns([2, 3])
     
     with col1:
-        st.image(movie["image"], width=200)
+        # OMDB reports a missing poster as "N/A"
+        if movie["image"] and movie["image"] != "N/A":
+            st.image(movie["image"], width=200)
     
     with col2:
         st.components.v1.html(f"""
@@ -159,66 +241,152 @@ def displayMovieContent(movie):
         """, height=150)
 
 
-def getEmojiString(head):
-    """Get emoji string for emotion/sentiment"""
-    emojiHead = ""
-    emotions = head.split("-")
-    for emotion in emotions:
-        emo = emotion.strip()
-        emojiHead += getEmoji.get(emo.lower(), getEmoji.get(emo, ""))
-    return head + " " + emojiHead
+def getEmojiString(label, key):
+    """Get emoji string for an emotion/sentiment label code of a backend"""
+    return labelName(label, key) + " " + getEmoji.get(label, "")
 
 
 def applyModal(movie, packageName):
-    """Apply sentiment analysis model to movie reviews"""
+    """Apply sentiment analysis model to movie reviews and aggregate the labels"""
     try:
-        if packageName == "Flair":
-            predictionList = [modals.flair(review) for review in movie["reviews"]]
-        elif packageName == "TextBlob":
-            predictionList = [modals.textBlob(review) for review in movie["reviews"]]
-        elif packageName == "Vader":
-            predictionList = [modals.vader(review) for review in movie["reviews"]]
-        elif packageName == "Text2emotion":
-            predictionList = [modals.text2emotion(review) for review in movie["reviews"]]
-        else:
-            return {}
+        key = packageName.lower()
+        if key not in modals.BACKENDS:
+            return aggregates.SentimentAggregate()
+        
+        # Results depend on the model and on how reviews are chunked and folded
+        version = f"{modals.modelVersion(key)};{documentMaxTokens};{documentAggregate}"
+        if storedResults is not None and storedResults.has(movie["id"], key, version):
+            with instrumentation.span("store.load"):
+                return storedResults.aggregate(movie["id"], key, version)
         
-        valueCounts = dict(pd.Series(predictionList).value_counts())
-        print(valueCounts)
-        return valueCounts
+        scorer = None
+        if scoringWorkers:
+            scorer = scoringEngine.sharedEngine(packageName, scoringWorkers).score
+        results = documentAnalysis.analyzeDocuments(
+            movie["reviews"], packageName,
+            maxTokens=documentMaxTokens,
+            aggregate=documentAggregate,
+            scorer=scorer
+        )
+        
+        with instrumentation.span("aggregate.update"):
+            aggregate = aggregates.SentimentAggregate().update(results)
+        if storedResults is not None:
+            with instrumentation.span("store.append"):
+                storedResults.appendIfMissing(movie["id"], key, movie["reviews"], results, version)
+        logger.debug("Label counts for %s: %s", movie["title"], aggregate.counts())
+        return aggregate
+    except Exception as e:
+        st.error(f"Error analyzing reviews: {str(e)}")
+        return aggregates.SentimentAggregate()
+
+
+def compareModals(movie):
+    """Score movie reviews with every available backend at once"""
+    try:
+        with instrumentation.span("inference.compare"):
+            documents = documentAnalysis.compareDocuments(
+                movie["reviews"],
+                maxTokens=documentMaxTokens,
+                aggregate=documentAggregate,
+                workers=scoringWorkers
+            )
+        return documents
     except Exception as e:
         st.error(f"Error analyzing reviews: {str(e)}")
         return {}
 
 
-def process(movieName, packageName):
-    """Process movie search and sentiment analysis"""
-    global lastSearched, cacheData
+def renderComparison(movie):
+    """Display every backend's label distribution side by side with their agreement"""
+    documents = compareModals(movie)
+    if not documents:
+        return
     
-    if lastSearched != movieName:
-        data = getData(movieName)
-        lastSearched = movieName
-        cacheData = data
-    else:
-        data = cacheData
+    st.write("")
+    st.write("")
+    displayMovieContent(movie)
+    
+    cols = st.columns(len(documents))
+    for col, (key, results) in zip(cols, documents.items()):
+        aggregate = aggregates.SentimentAggregate().update(results)
+        with col:
+            st.subheader(BACKEND_NAMES[key])
+            for label, count in aggregate.counts().items():
+                st.metric(getEmojiString(label, key), count)
+            proportions = aggregate.proportions()
+            plotPie([labelName(label, key) for label in proportions], list(proportions.values()),
+                    key=f"pie-{movie['id']}-{key}")
+    
+    st.subheader("Agreement")
+    st.caption("Share of reviews on which two packages give the same polarity; emotions count as "
+               "positive (happy), neutral (surprise or none) or negative (sad, angry, fear).")
+    names, matrix = aggregates.agreementMatrix(documents)
+    plotAgreement([BACKEND_NAMES[name] for name in names], matrix, key=f"agreement-{movie['id']}")
+
+
+def renderMovie(movie, packageName):
+    """Score one movie's reviews and display its metrics and chart"""
+    if len(movie.get("reviews", [])) == 0:
+        st.warning(f"No reviews found for {movie['title']}")
+        return
+    
+    if packageName == COMPARE_ALL:
+        renderComparison(movie)
+        return
     
+    result = applyModal(movie, packageName)
+    key = packageName.lower()
+    
+    if result:
+        counts = result.counts()
+        keys = list(counts.keys())
+        values = list(counts.values())
+        
+        st.write("")
+        st.write("")
+        displayMovieContent(movie)
+        
+        # Display metrics in rows of 4
+        for i in range(0, len(keys), 4):
+            if (i + 3) < len(keys):
+                cols = st.columns(4)
+                for j in range(4):
+                    if i + j < len(keys):
+                        cols[j].metric(
+                            getEmojiString(keys[i + j], key),
+                            round(values[i + j], 2)
+                        )
+            else:
+                cols = st.columns(4)
+                for j in range(len(keys) - i):
+                    cols[j].metric(
+                        getEmojiString(keys[i + j], key),
+                        round(values[i + j], 2)
+                    )
+        
+        st.write("")
+        st.write("")
+        
+        # Display pie chart
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.subheader("Visual Representation")
+            proportions = result.proportions()
+            plotPie([labelName(label, key) for label in proportions], list(proportions.values()),
+                    key=f"pie-{movie['id']}")
+
+
+def process(movieName, packageName):
+    """Process movie search and sentiment analysis"""
     try:
-        data_dict = json.loads(data) if isinstance(data, str) else data
-        movies = data_dict.get("result", [])
+        logger.debug("Fetching movies for %r", movieName)
+        with instrumentation.span("fetch.search"):
+            movies = getMovies(movieName)
         
         if len(movies) > 0:
-            st.text("")
-            st.components.v1.html("""
-            <h3 style="color: #ef4444; font-family: Source Sans Pro, sans-serif; font-size: 22px; margin-bottom: 0px; margin-top: 40px;">
-                API Response
-            </h3>
-            <p style="color: #57534e; font-family: Source Sans Pro, sans-serif; font-size: 14px;">
-                Expand below to see the API response received for the search
-            </p>
-            """, height=100)
-            
-            with st.expander("See JSON Response"):
-                st.json(data)
+            # Filled in once every title has been fetched
+            responseSection = st.container()
             
             # Display results
             st.components.v1.html("""
@@ -230,50 +398,42 @@ def process(movieName, packageName):
             </p>
             """, height=150)
             
+            # Every title is listed as soon as the search returns, and each
+            # one fills in as its details arrive and its reviews are scored
+            progress = st.progress(0.0, text=f"Analyzing {len(movies)} movies...")
+            placeholders = []
             for movie in movies:
-                if len(movie.get("reviews", [])) > 0:
-                    with st.expander(movie["title"]):
-                        result = applyModal(movie, packageName)
-                        
-                        if result:
-                            keys = list(result.keys())
-                            values = list(result.values())
-                            
-                            st.write("")
-                            st.write("")
-                            displayMovieContent(movie)
-                            
-                            # Display metrics in rows of 4
-                            for i in range(0, len(keys), 4):
-                                if (i + 3) < len(keys):
-                                    cols = st.columns(4)
-                                    for j in range(4):
-                                        if i + j < len(keys):
-                                            cols[j].metric(
-                                                getEmojiString(keys[i + j]),
-                                                round(values[i + j], 2)
-                                            )
-                                else:
-                                    cols = st.columns(4)
-                                    for j in range(len(keys) - i):
-                                        cols[j].metric(
-                                            getEmojiString(keys[i + j]),
-                                            round(values[i + j], 2)
-                                        )
-                            
-                            st.write("")
-                            st.write("")
-                            
-                            # Display pie chart
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.subheader("Visual Representation")
-                                plotPie(
-                                    list(result.keys()),
-                                    [value / len(movie["reviews"]) for value in list(result.values())]
-                                )
-                else:
-                    st.warning(f"No reviews found for {movie['title']}")
+                with st.expander(movie["title"]):
+                    placeholder = st.empty()
+                    placeholder.info("Fetching details...")
+                placeholders.append(placeholder)
+            
+            data = [None] * len(movies)
+            responses = omdb.mapCompleted(fetchMovieDetails, [movie["id"] for movie in movies])
+            for done, (i, response) in enumerate(responses, 1):
+                with placeholders[i].container():
+                    # Inside the movie's slot, so a failed detail fetch is reported there
+                    data[i] = buildMovie(movies[i], response)
+                    try:
+                        renderMovie(data[i], packageName)
+                    except Exception as e:
+                        st.error(f"Error displaying {data[i]['title']}: {str(e)}")
+                progress.progress(done / len(movies), text=f"Analyzed {done} of {len(movies)} movies")
+            progress.empty()
+            
+            with responseSection:
+                st.text("")
+                st.components.v1.html("""
+                <h3 style="color: #ef4444; font-family: Source Sans Pro, sans-serif; font-size: 22px; margin-bottom: 0px; margin-top: 40px;">
+                    API Response
+                </h3>
+                <p style="color: #57534e; font-family: Source Sans Pro, sans-serif; font-size: 14px;">
+                    Expand below to see the API response received for the search
+                </p>
+                """, height=100)
+                
+                with st.expander("See JSON Response"):
+                    st.json({"userSearch": movieName, "result": data})
         else:
             st.warning("No movies found for your search query.")
     except Exception as e:
@@ -295,12 +455,19 @@ def renderPage():
     available_packages = ['Vader', 'TextBlob', 'Text2emotion']
     if modals.FLAIR_AVAILABLE:
         available_packages.insert(0, 'Flair')
+    available_packages.append(COMPARE_ALL)
     
     packageName = st.selectbox(
         'Select Package',
         available_packages
     )
     
+    # Start loading the selected model(s) while the user types
+    if packageName == COMPARE_ALL:
+        modals.warmUp(modals.availableBackends())
+    else:
+        modals.warmUp([packageName.lower()])
+    
     # Show warning if Flair is not available
     if not modals.FLAIR_AVAILABLE:
         st.info("💡 Flair is not available. Install it with: `pip install flair` to get more sentiment analysis options.")
@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the span duration histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations, as Prometheus exposes them"""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_collectors = {}
+
+
+def observe(name, seconds):
+    """Record one duration for a span name"""
+    with _lock:
+        histogram = _spans.get(name)
+        if histogram is None:
+            histogram = _spans[name] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block under a span name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def increment(name, value=1):
+    """Add to a named counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def registerCollector(name, collect):
+    """
+    Register a callable returning a dict of numbers read at export time,
+    such as a cache's stats()
+    """
+    with _lock:
+        _collectors[name] = collect
+
+
+def snapshot():
+    """
+    Return the current metrics
+
+    Returns:
+        dict: spans (name -> count, total, mean, p50, p95, max in seconds),
+        counters (name -> value) and collectors (name -> dict)
+    """
+    with _lock:
+        spans = {
+            name: {
+                "count": histogram.count,
+                "total": histogram.sum,
+                "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "max": histogram.max
+            }
+            for name, histogram in _spans.items()
+        }
+        counters = dict(_counters)
+        collectors = dict(_collectors)
+
+    collected = {}
+    for name, collect in collectors.items():
+        try:
+            collected[name] = collect()
+        except Exception:
+            logger.exception("Metrics collector %s failed", name)
+    return {"spans": spans, "counters": counters, "collectors": collected}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def renderPrometheus():
+    """Render every metric in the Prometheus text exposition format"""
+    with _lock:
+        spans = {name: (list(h.buckets), h.count, h.sum) for name, h in _spans.items()}
+        counters = dict(_counters)
+
+    lines = [
+        "# HELP sentiment_span_seconds Time spent per processing stage",
+        "# TYPE sentiment_span_seconds histogram"
+    ]
+    for name, (buckets, count, total) in sorted(spans.items()):
+        label = f'span="{_escape(name)}"'
+        cumulative = 0
+        for bound, bucketCount in zip(BUCKETS, buckets):
+            cumulative += bucketCount
+            lines.append(f'sentiment_span_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'sentiment_span_seconds_bucket{{{label},le="+Inf"}} {count}')
+        lines.append(f"sentiment_span_seconds_sum{{{label}}} {total}")
+        lines.append(f"sentiment_span_seconds_count{{{label}}} {count}")
+
+    lines += [
+        "# HELP sentiment_events_total Counted events",
+        "# TYPE sentiment_events_total counter"
+    ]
+    for name, value in sorted(counters.items()):
+        lines.append(f'sentiment_events_total{{event="{_escape(name)}"}} {value}')
+
+    lines += [
+        "# HELP sentiment_collected Values read from caches and other components",
+        "# TYPE sentiment_collected gauge"
+    ]
+    for name, values in sorted(snapshot()["collectors"].items()):
+        for key, value in sorted(values.items()):
+            if isinstance(value, (int, float)):
+                lines.append(f'sentiment_collected{{source="{_escape(name)}",stat="{_escape(key)}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        payload = renderPrometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def startMetricsServer(port):
+    """Serve renderPrometheus() over HTTP on a daemon thread, once per process"""
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server or None
+        try:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError as e:
+            # Another worker on this machine already serves the port
+            logger.warning("Metrics server not started on port %s: %s", port, e)
+            _server = False
+            return None
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
@@ -1,8 +1,19 @@
+import logging
+import os
 import streamlit as st
+import instrumentation
 import sidebar
 import textPage
 import imdbReviewsPage
 import imagePage
+import diagnosticsPage
+
+# Debug output of the analyzers is only produced when LOG_LEVEL asks for it
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING"))
+
+# Set METRICS_PORT to expose Prometheus metrics over HTTP
+if os.environ.get("METRICS_PORT"):
+    instrumentation.startMetricsServer(int(os.environ["METRICS_PORT"]))
 
 st.set_page_config(
     page_title="Sentiment Analysis App",
@@ -18,3 +29,5 @@ elif page == "Movie Analysis":
     imdbReviewsPage.renderPage()
 elif page == "Image":
     imagePage.renderPage()
+elif page == "Diagnostics":
+    diagnosticsPage.renderPage()
@@ -1,65 +1,551 @@
-from textblob import TextBlob
-import nltk
-try:
-    from nltk.sentiment.vader import SentimentIntensityAnalyzer
-except ImportError:
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import text2emotion as te
-import cv2
+import importlib.metadata
+import importlib.util
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 import numpy as np
+import caching
+import instrumentation
+import results
+from results import Label
 
-# Download required NLTK data
-try:
-    nltk.download('vader_lexicon', quiet=True)
-except:
-    pass
+logger = logging.getLogger(__name__)
 
-# Initialize models (with error handling)
-try:
+# Availability is decided from the installed packages so that importing
+# this module never loads a model; models are loaded on first use
+FLAIR_AVAILABLE = importlib.util.find_spec("flair") is not None
+if not FLAIR_AVAILABLE:
+    logger.info("Flair not available - some features will be disabled")
+
+FER_AVAILABLE = importlib.util.find_spec("fer") is not None
+if not FER_AVAILABLE:
+    logger.info("FER not available - image emotion detection will be disabled")
+
+
+def _ensureNltkData(resource, package):
+    """Download an NLTK package only if it is not already on disk"""
+    import nltk
+    
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        try:
+            nltk.download(package, quiet=True)
+        except Exception:
+            pass
+
+
+# Flair inference runtime: "torch" runs the full-precision model, "int8"
+# applies dynamic int8 quantization to its Linear and LSTM layers
+FLAIR_RUNTIME = os.environ.get("FLAIR_RUNTIME", "torch").lower()
+
+# Intra-op threads used by torch on CPU, 0 keeps torch's default
+FLAIR_THREADS = int(os.environ.get("FLAIR_THREADS", 0))
+
+
+def quantizeFlair(classifier):
+    """
+    Return a dynamically int8-quantized copy of a Flair classifier
+    
+    Weights of Linear and LSTM layers are stored as int8 and activations are
+    quantized on the fly, which speeds up CPU inference at a small accuracy
+    cost; run benchmarks/flairParity.py to measure both.
+    
+    Args:
+        classifier (flair.models.TextClassifier): Full-precision model
+        
+    Returns:
+        flair.models.TextClassifier: Quantized copy, in eval mode
+    """
+    import torch
+    
+    classifier.eval()
+    return torch.quantization.quantize_dynamic(
+        classifier, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8
+    )
+
+
+def _loadFlair():
+    import torch
     from flair.models import TextClassifier
-    from flair.data import Sentence
-    sia = TextClassifier.load('en-sentiment')
-    FLAIR_AVAILABLE = True
-except ImportError:
-    FLAIR_AVAILABLE = False
-    print("Flair not available - some features will be disabled")
+    
+    if FLAIR_THREADS:
+        torch.set_num_threads(FLAIR_THREADS)
+    
+    classifier = TextClassifier.load('en-sentiment')
+    if FLAIR_RUNTIME == "int8":
+        return quantizeFlair(classifier)
+    classifier.eval()
+    return classifier
+
 
-try:
+def _loadFer():
     from fer import FER
-    emo_detector = FER(mtcnn=True)
-    FER_AVAILABLE = True
-except ImportError:
-    FER_AVAILABLE = False
-    print("FER not available - image emotion detection will be disabled")
+    return FER(mtcnn=True)
 
 
-def flair(text):
+def _loadTextBlob():
+    # The pattern analyzer is stateless, one instance serves every call
+    from textblob.en.sentiments import PatternAnalyzer
+    return PatternAnalyzer()
+
+
+def _loadVader():
+    # Building an analyzer parses the whole lexicon file, so a single instance
+    # is shared; polarity_scores only reads the lexicon and keeps no per-call
+    # state on the analyzer, which makes it safe across concurrent sessions
+    try:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        _ensureNltkData('sentiment/vader_lexicon.zip', 'vader_lexicon')
+        return SentimentIntensityAnalyzer()
+    except (ImportError, LookupError):
+        # vaderSentiment ships its own copy of the lexicon
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer()
+
+
+def _loadText2emotion():
+    import emotionEngine
+    
+    for resource, package in (('corpora/stopwords', 'stopwords'),
+                              ('corpora/wordnet', 'wordnet')):
+        _ensureNltkData(resource, package)
+    
+    # Compiles text2emotion's lexicon once instead of on every get_emotion call
+    return emotionEngine.EmotionEngine()
+
+
+# Model registry: name -> loader, populated lazily into process-wide singletons
+_loaders = {
+    "flair": _loadFlair,
+    "fer": _loadFer,
+    "textblob": _loadTextBlob,
+    "vader": _loadVader,
+    "text2emotion": _loadText2emotion
+}
+_models = {}
+_loadLocks = {name: threading.Lock() for name in _loaders}
+
+# Seconds a failed load is remembered before it is retried, so reruns and
+# readiness probes do not repeat a failing download on every call
+MODEL_RETRY_INTERVAL = float(os.environ.get("MODEL_RETRY_INTERVAL", 300))
+
+# name -> (exception, time.monotonic() of the failed load)
+_failures = {}
+
+
+def _recentFailure(name):
+    """The exception of a load that failed within MODEL_RETRY_INTERVAL, or None"""
+    failure = _failures.get(name)
+    if failure is None or time.monotonic() - failure[1] >= MODEL_RETRY_INTERVAL:
+        return None
+    return failure[0]
+
+
+def getModel(name):
     """
-    Sentiment analysis using Flair
+    Return the process-wide instance of a model, loading it on first use
+    
+    A failed load is remembered, and its exception is raised again without
+    retrying until MODEL_RETRY_INTERVAL seconds have passed.
     
     Args:
-        text (str): Input text to analyze
+        name (str): Registry name (flair/fer/textblob/vader/text2emotion)
         
     Returns:
-        str: Sentiment classification (POSITIVE/NEGATIVE/NEUTRAL)
+        object: The loaded model
+    """
+    try:
+        return _models[name]
+    except KeyError:
+        pass
+    
+    with _loadLocks[name]:
+        if name not in _models:
+            failure = _recentFailure(name)
+            if failure is not None:
+                raise failure
+            try:
+                with instrumentation.span(f"model.load.{name}"):
+                    _models[name] = _loaders[name]()
+            except Exception as e:
+                _failures[name] = (e, time.monotonic())
+                raise
+            _failures.pop(name, None)
+        return _models[name]
+
+
+def isLoaded(name):
+    """Tell whether a model has already been loaded in this process"""
+    return name in _models
+
+
+def warmUp(names=None, background=True):
+    """
+    Load models ahead of their first use
+    
+    Args:
+        names (list): Registry names to load, all available models if None
+        background (bool): Load in a daemon thread instead of blocking
+        
+    Returns:
+        threading.Thread: The loading thread, or None when nothing runs in background
+    """
+    if names is None:
+        names = [name for name in _loaders
+                 if (name != "flair" or FLAIR_AVAILABLE) and (name != "fer" or FER_AVAILABLE)]
+    # Models that failed to load recently are skipped until their retry is due
+    names = [name for name in names if not isLoaded(name) and _recentFailure(name) is None]
+    if not names:
+        return None
+    
+    def load():
+        for name in names:
+            try:
+                getModel(name)
+            except Exception as e:
+                logger.warning("Could not load model %s: %s", name, e)
+    
+    if not background:
+        load()
+        return None
+    
+    thread = threading.Thread(target=load, name="modals-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+# Result cache shared by every session of this process; set
+# SENTIMENT_CACHE_DB to a file path to share results across worker processes
+resultCache = caching.ResultCache(
+    maxBytes=int(os.environ.get("SENTIMENT_CACHE_BYTES", 64 * 1024 * 1024)),
+    path=os.environ.get("SENTIMENT_CACHE_DB")
+)
+instrumentation.registerCollector("cache.results", resultCache.stats)
+
+# Packages whose versions identify each backend's model in cache keys
+_MODEL_PACKAGES = {
+    "flair": ("flair",),
+    "textblob": ("textblob",),
+    "vader": ("nltk", "vaderSentiment"),
+    "text2emotion": ("text2emotion",)
+}
+
+
+@lru_cache(maxsize=None)
+def modelVersion(backend):
+    """Version string of a backend's model, used to invalidate cached results"""
+    versions = []
+    for package in _MODEL_PACKAGES[backend]:
+        try:
+            versions.append(f"{package}=={importlib.metadata.version(package)}")
+        except importlib.metadata.PackageNotFoundError:
+            versions.append(f"{package}==none")
+    if backend == "flair":
+        versions.append(f"en-sentiment-{FLAIR_RUNTIME}")
+    if backend == "text2emotion":
+        versions.append("emotionEngine")
+    versions.append(f"results=={results.FORMAT}")
+    return ",".join(versions)
+
+
+# Number of texts sent through a backend at once by analyzeBatch
+DEFAULT_BATCH_SIZE = 32
+
+
+def flairBatch(texts, batchSize=DEFAULT_BATCH_SIZE):
+    """
+    Sentiment analysis of many texts using Flair
+    
+    Args:
+        texts (list): Input texts to analyze
+        batchSize (int): Mini-batch size passed to the classifier
+        
+    Returns:
+        list: One results.Result per text
     """
     if not FLAIR_AVAILABLE:
-        return "NEUTRAL - Flair not available"
+        return [results.Result("flair", Label.UNAVAILABLE, 0.0) for _ in texts]
+    
+    from flair.data import Sentence
+    
+    sentences = [Sentence(text) for text in texts]
+    getModel("flair").predict(sentences, mini_batch_size=batchSize)
+    
+    scored = []
+    for sentence in sentences:
+        if not sentence.labels:
+            # Flair skips sentences without tokens
+            scored.append(results.Result("flair", Label.NEUTRAL, 0.0))
+            continue
+        
+        label = sentence.labels[0]
+        positive = label.score if label.value == "POSITIVE" else 1 - label.score
+        scored.append(results.Result("flair", results.flairLabel(label.value, label.score), label.score,
+                                     (positive, 1 - positive)))
+    
+    return scored
+
+
+def textBlobBatch(texts):
+    """
+    Sentiment analysis of many texts using TextBlob
+    
+    Args:
+        texts (list): Input texts to analyze
+        
+    Returns:
+        list: One results.Result per text
+    """
+    analyzer = getModel("textblob")
+    
+    scored = []
+    for text in texts:
+        sentiment = analyzer.analyze(text)
+        polarity = round(sentiment.polarity, 2)
+        scored.append(results.Result("textblob", results.polarityLabel(polarity), polarity,
+                                     (sentiment.polarity, sentiment.subjectivity)))
+    
+    return scored
+
+
+# Columns returned by vaderScores, in order
+VADER_FIELDS = results.FIELDS["vader"]
+
+
+def vaderScores(texts, asFrame=False):
+    """
+    Full VADER scores for a batch of texts
+    
+    Args:
+        texts (iterable): Input texts to analyze
+        asFrame (bool): Return a pandas DataFrame instead of arrays
+        
+    Returns:
+        dict | pandas.DataFrame: neg/neu/pos/compound as NumPy arrays,
+        or as the columns of a DataFrame with one row per text
+    """
+    analyzer = getModel("vader")
+    texts = list(texts)
+    
+    scores = np.empty((len(texts), len(VADER_FIELDS)), dtype=np.float64)
+    for i, text in enumerate(texts):
+        result = analyzer.polarity_scores(text)
+        scores[i] = [result[field] for field in VADER_FIELDS]
+    
+    if asFrame:
+        import pandas as pd
+        return pd.DataFrame(scores, columns=VADER_FIELDS)
+    
+    return {field: scores[:, i] for i, field in enumerate(VADER_FIELDS)}
+
+
+def vaderBatch(texts):
+    """
+    Sentiment analysis of many texts using VADER
+    
+    Args:
+        texts (list): Input texts to analyze
+        
+    Returns:
+        list: One results.Result per text
+    """
+    scores = vaderScores(texts)
+    rows = np.column_stack([scores[field] for field in VADER_FIELDS]).tolist()
+    
+    return [results.Result("vader", results.compoundLabel(row[-1]), row[-1], tuple(row)) for row in rows]
+
+
+def text2emotionBatch(texts):
+    """
+    Emotion analysis of many texts using text2emotion's lexicon, compiled
+    by emotionEngine
+    
+    Args:
+        texts (list): Input texts to analyze
+        
+    Returns:
+        list: One results.Result per text
+    """
+    engine = getModel("text2emotion")
+    
+    scored = []
+    for emotion in engine.getEmotions(texts):
+        label, secondary = results.emotionLabel(emotion)
+        scored.append(results.Result.fromScores("text2emotion", label, max(emotion.values()), emotion, secondary))
+    
+    return scored
+
+
+# Batch entry points keyed by lower-cased package name
+BACKENDS = {
+    "flair": flairBatch,
+    "textblob": textBlobBatch,
+    "vader": vaderBatch,
+    "text2emotion": text2emotionBatch
+}
+
+
+def _analyzeChunk(chunk, key, batchSize, useCache):
+    """Score one chunk, answering what it can from the result cache"""
+    batchFn = BACKENDS[key]
+    
+    def run(texts):
+        with instrumentation.span(f"inference.{key}"):
+            if key == "flair":
+                return batchFn(texts, batchSize=batchSize)
+            return batchFn(texts)
+    
+    if not useCache:
+        return run(chunk)
+    
+    version = modelVersion(key)
+    keys = [caching.textKey(key, version, text) for text in chunk]
+    found = resultCache.getMany(list(dict.fromkeys(keys)))
+    
+    # Score each distinct missing text once
+    pending = {}
+    for cacheKey, text in zip(keys, chunk):
+        if cacheKey not in found and cacheKey not in pending:
+            pending[cacheKey] = text
+    
+    if pending:
+        computed = dict(zip(pending.keys(), run(list(pending.values()))))
+        # "Flair not available" placeholders must not outlive an install
+        if key != "flair" or FLAIR_AVAILABLE:
+            resultCache.putMany(computed)
+        found.update(computed)
+    
+    return [found[cacheKey] for cacheKey in keys]
+
+
+def analyzeBatch(texts, backend, batchSize=DEFAULT_BATCH_SIZE, useCache=True):
+    """
+    Run one backend over a list or iterator of texts
+    
+    Texts are consumed in chunks of ``batchSize`` so arbitrarily long
+    iterators never have to be materialized at once. Results are looked up
+    in ``resultCache`` by backend, model version and normalized text, and
+    only the misses reach the model.
+    
+    Args:
+        texts (iterable): Input texts to analyze
+        backend (str): Package name (Flair/TextBlob/Vader/Text2emotion)
+        batchSize (int): Number of texts handed to the backend at once
+        useCache (bool): Read and fill the result cache
+        
+    Returns:
+        list: One results.Result per text, in input order
+    """
+    key = backend.lower()
+    if key not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
     
-    sentence = Sentence(text)
-    sia.predict(sentence)
-    score = str(sentence.labels[0])
+    iterator = iter(texts)
+    scored = []
     
-    startIdx = int(score.rfind("("))
-    endIdx = int(score.rfind(")"))
-    percentage = float(score[startIdx+1:endIdx])
+    while True:
+        chunk = list(islice(iterator, batchSize))
+        if not chunk:
+            break
+        scored.extend(_analyzeChunk(chunk, key, batchSize, useCache))
+    
+    return scored
+
+
+def availableBackends():
+    """Lower-cased names of the backends that can run here"""
+    return [key for key in BACKENDS if key != "flair" or FLAIR_AVAILABLE]
+
+
+_compareExecutor = None
+_compareLock = threading.Lock()
+
+
+def analyzeAll(texts, backends=None, batchSize=DEFAULT_BATCH_SIZE, useCache=True, workers=0):
+    """
+    Run several backends over the same texts
+    
+    Texts are normalized and de-duplicated once. In process, the
+    pure-Python backends score one after another, since on threads they
+    only contend for the GIL; Flair, which releases the GIL inside torch,
+    scores on a thread alongside them. With ``workers`` each backend scores
+    on its own shared, non-forking scoringEngine process pool instead, so
+    on enough cores the total time approaches that of the slowest backend
+    rather than the sum of all of them.
+    
+    Args:
+        texts (list): Input texts to analyze
+        backends (list): Package names, every available backend if None
+        batchSize (int): Number of texts handed to a backend at once
+        useCache (bool): Read and fill the result cache (threads only)
+        workers (int): Worker processes per backend, 0 to score in process
+        
+    Returns:
+        dict: Lower-cased backend name -> one results.Result per text, in input
+        order; backends whose model fails to load are left out
+    """
+    global _compareExecutor
+    
+    keys = availableBackends() if backends is None else [backend.lower() for backend in backends]
+    for key in keys:
+        if key not in BACKENDS:
+            raise ValueError(f"Unknown backend: {key}")
+    
+    # Importing nltk-based packages from parallel threads can expose
+    # half-initialized modules, so models are loaded one after another first
+    loaded = []
+    for key in keys:
+        if key == "flair" and not FLAIR_AVAILABLE:
+            loaded.append(key)
+            continue
+        try:
+            getModel(key)
+            loaded.append(key)
+        except Exception as e:
+            logger.warning("Skipping %s in comparison: %s", key, e)
+    
+    normalized = [caching.normalizeText(text) for text in texts]
+    distinct = list(dict.fromkeys(normalized))
+    
+    with _compareLock:
+        if _compareExecutor is None:
+            _compareExecutor = ThreadPoolExecutor(max_workers=len(BACKENDS), thread_name_prefix="compare")
+    
+    if workers:
+        import scoringEngine
+        
+        # Engines are created here rather than on the pool's threads; shared
+        # engines never fork, so their workers start safely from any thread
+        engines = {key: scoringEngine.sharedEngine(key, workers) for key in loaded}
+        futures = {key: _compareExecutor.submit(engine.score, distinct) for key, engine in engines.items()}
+    else:
+        futures = {key: _compareExecutor.submit(analyzeBatch, distinct, key, batchSize, useCache)
+                   for key in loaded if key == "flair" and FLAIR_AVAILABLE}
+    
+    scoredByBackend = {}
+    for key in loaded:
+        scored = futures[key].result() if key in futures else analyzeBatch(distinct, key, batchSize, useCache)
+        scored = dict(zip(distinct, scored))
+        scoredByBackend[key] = [scored[text] for text in normalized]
+    return scoredByBackend
+
+
+def flair(text):
+    """
+    Sentiment analysis using Flair
     
-    if percentage < 0.60:
-        return "NEUTRAL"
-    elif "POSITIVE" in str(score):
-        return "POSITIVE"
-    elif "NEGATIVE" in str(score):
-        return "NEGATIVE"
+    Args:
+        text (str): Input text to analyze
+        
+    Returns:
+        str: Sentiment classification (POSITIVE/NEGATIVE/NEUTRAL)
+    """
+    return analyzeBatch([text], "Flair")[0].labelText()
 
 
 def textBlob(text):
@@ -72,15 +558,7 @@ def textBlob(text):
     Returns:
         str: Sentiment classification (Positive/Negative/Neutral)
     """
-    tb = TextBlob(text)
-    polarity = round(tb.polarity, 2)
-    
-    if polarity > 0:
-        return "Positive"
-    elif polarity == 0:
-        return "Neutral"
-    else:
-        return "Negative"
+    return analyzeBatch([text], "TextBlob")[0].labelText()
 
 
 def vader(text):
@@ -93,14 +571,7 @@ def vader(text):
     Returns:
         str: Sentiment classification (Positive/Negative/Neutral)
     """
-    scores = SentimentIntensityAnalyzer().polarity_scores(text)
-    
-    if scores['compound'] >= 0.05:
-        return "Positive"
-    elif scores['compound'] <= -0.05:
-        return "Negative"
-    else:
-        return "Neutral"
+    return analyzeBatch([text], "Vader")[0].labelText()
 
 
 def text2emotion(text):
@@ -113,35 +584,66 @@ def text2emotion(text):
     Returns:
         str: Dominant emotion(s)
     """
-    emotion = dict(te.get_emotion(text))
-    emotion = sorted(emotion.items(), key=lambda kv: (kv[1], kv[0]), reverse=True)
+    result = analyzeBatch([text], "Text2emotion")[0]
+    logger.debug("text2emotion %s -> %s", result.scoreDict(), result.labelText())
+    return result.labelText()
+
+
+# Longest image side, in pixels, that face detection runs on; larger images
+# are detected on a downscaled copy and the boxes mapped back
+DETECT_MAX_SIDE = 640
+
+
+def detectFaces(image, detectMaxSide=DETECT_MAX_SIDE):
+    """
+    Find face boxes, running the detector on a downscaled copy of large images
+    
+    Args:
+        image (numpy.ndarray): Input image
+        detectMaxSide (int): Longest side to detect on, None for full size
+        
+    Returns:
+        list: (x, y, w, h) boxes in full-resolution coordinates
+    """
+    import cv2
     
-    emotionStr = list(emotion)[0][0]
+    height, width = image.shape[:2]
+    scale = 1.0
+    if detectMaxSide and max(height, width) > detectMaxSide:
+        scale = detectMaxSide / max(height, width)
+        image = cv2.resize(image, (round(width * scale), round(height * scale)),
+                           interpolation=cv2.INTER_AREA)
     
-    if (list(emotion)[1][1] >= 0.5 or list(emotion)[1][1] == list(emotion)[0][1]):
-        emotionStr += " - {}".format(list(emotion)[1][0])
+    boxes = getModel("fer").find_faces(image, bgr=True)
     
-    print(emotion, emotionStr)
-    return emotionStr
+    return [
+        tuple(int(round(value / scale)) for value in box)
+        for box in boxes
+    ]
 
 
-def imageEmotion(image):
+def topEmotion(detections):
+    """Top emotion of the first detected face, as FER.top_emotion reports it"""
+    if not detections:
+        return None, None
+    
+    emotions = detections[0]["emotions"]
+    top = max(emotions, key=emotions.get)
+    return top, emotions[top]
+
+
+def annotateImage(image, detections):
     """
-    Emotion detection in images using FER
+    Draw face boxes and their dominant emotion on a copy of an image
     
     Args:
         image (numpy.ndarray): Input image
+        detections (list): Detections as returned by FER.detect_emotions
         
     Returns:
-        tuple: (detected_emotions, top_emotion, annotated_image)
+        numpy.ndarray: Annotated copy of the image
     """
-    if not FER_AVAILABLE:
-        return [], ("neutral", 0.0), image
-    
-    captured_emotions = emo_detector.detect_emotions(image)
-    topEmotion = emo_detector.top_emotion(image)
-    
-    print(captured_emotions, topEmotion)
+    import cv2
     
     img = image.copy()
     
@@ -152,7 +654,7 @@ def imageEmotion(image):
     thickness = 2
     
     # Annotate image with emotion detection results
-    for emotion in captured_emotions:
+    for emotion in detections:
         x, y, w, h = tuple(emotion["box"])
         org = (x + w + 4, y + 5)
         emotions = emotion["emotions"]
@@ -165,4 +667,51 @@ def imageEmotion(image):
         cv2.putText(img, emotions[len(emotions) - 1][0], org, font,
                    fontScale, color, thickness, cv2.LINE_AA)
     
-    return captured_emotions, topEmotion, img
+    return img
+
+
+def imageEmotion(image, detectMaxSide=DETECT_MAX_SIDE, annotate=True):
+    """
+    Emotion detection in images using FER
+    
+    Faces are detected once, on a downscaled copy when the image is larger
+    than ``detectMaxSide``, and their emotions are classified on the
+    full-resolution image. The top emotion is derived from those detections.
+    
+    Args:
+        image (numpy.ndarray): Input image
+        detectMaxSide (int): Longest side to detect on, None for full size
+        annotate (bool): Draw the detections on a copy of the image
+        
+    Returns:
+        tuple: (detected_emotions, top_emotion, annotated_image)
+    """
+    if not FER_AVAILABLE:
+        return [], ("neutral", 0.0), image
+    
+    with instrumentation.span("inference.fer"):
+        boxes = detectFaces(image, detectMaxSide)
+        captured_emotions = getModel("fer").detect_emotions(image, face_rectangles=boxes) if boxes else []
+    top = topEmotion(captured_emotions)
+    
+    logger.debug("imageEmotion %s -> %s", captured_emotions, top)
+    
+    with instrumentation.span("render.annotate"):
+        img = annotateImage(image, captured_emotions) if annotate else image
+    return captured_emotions, top, img
+
+
+def imageEmotionBatch(images, detectMaxSide=DETECT_MAX_SIDE, annotate=False):
+    """
+    Emotion detection over many images or video frames
+    
+    Args:
+        images (iterable): Input images
+        detectMaxSide (int): Longest side to detect on, None for full size
+        annotate (bool): Also return annotated copies
+        
+    Returns:
+        list: One (detected_emotions, top_emotion, image) tuple per input,
+        where image is the annotated copy or the input itself
+    """
+    return [imageEmotion(image, detectMaxSide, annotate) for image in images]
@@ -0,0 +1,352 @@
+"""
+Local title catalogue with a memory-mapped prefix and trigram index
+
+Built once from an IMDb ``title.basics.tsv(.gz)`` dump or a JSONL file of
+OMDB records, then searched without the network. Every array is a .npy file
+in one directory, opened with ``mmap_mode="r"``, so opening a catalogue of
+millions of titles only reads a small JSON header:
+
+    ids.npy, types.npy               numeric imdbID and type code per title
+    titles/years/posters.npy         UTF-8 blobs, with *Offsets.npy per title
+    normalized.npy                   normalized titles (see normalizeTitle)
+    prefixOrder.npy                  titles sorted by normalized title
+    trigramKeys.npy                  distinct trigrams, sorted
+    trigramOffsets/Postings.npy      titles holding each trigram (CSR)
+    trigramCounts.npy                distinct trigrams per title
+
+search() ranks titles starting with the query first, then by trigram
+similarity, and answers in the shape of an OMDB ``s=`` response.
+
+Usage:
+    python movieCatalogue.py title.basics.tsv.gz catalogue/ [--types movie series]
+"""
+import argparse
+import bisect
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+import unicodedata
+
+import numpy as np
+
+# OMDB title types, stored as their index
+TYPES = ("movie", "series", "episode", "game")
+
+# IMDb titleType -> OMDB type
+IMDB_TYPES = {
+    "movie": "movie",
+    "short": "movie",
+    "tvMovie": "movie",
+    "tvShort": "movie",
+    "tvSpecial": "movie",
+    "video": "movie",
+    "tvSeries": "series",
+    "tvMiniSeries": "series",
+    "tvEpisode": "episode",
+    "videoGame": "game"
+}
+
+# Titles holding less than this share of the query's trigrams are not matches
+MIN_COVERAGE = 0.5
+
+_META = "catalogue.json"
+_NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+
+
+def normalizeTitle(title):
+    """Lower-case, strip accents and punctuation, collapse whitespace"""
+    title = unicodedata.normalize("NFKD", title.lower())
+    title = "".join(char if char.isalnum() else " " for char in title if not unicodedata.combining(char))
+    return " ".join(title.split())
+
+
+def _codepoints(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def trigrams(normalized):
+    """Distinct trigram codes of a normalized title, padded like "  title " """
+    points = _codepoints(f"  {normalized} ").astype(np.uint64)
+    if len(points) < 3:
+        return np.zeros(0, dtype=np.uint64)
+    return np.unique((points[:-2] << np.uint64(42)) | (points[1:-1] << np.uint64(21)) | points[2:])
+
+
+def _pack(strings):
+    """UTF-8 blob of strings and the offset of each string in it"""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class _Strings:
+    """Sequence view of a packed string blob"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def raw(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def __getitem__(self, i):
+        return self.raw(i).decode("utf-8")
+
+
+def _best(values, limit):
+    """Indices of the `limit` smallest values, in ascending order"""
+    if len(values) > limit:
+        values = np.asarray(values)
+        part = np.argpartition(values, limit)[:limit]
+        return part[np.argsort(values[part], kind="stable")]
+    return np.argsort(values, kind="stable")
+
+
+class _SortedView:
+    """Normalized titles as UTF-8 bytes in prefixOrder, for bisect"""
+
+    def __init__(self, strings, order):
+        self.strings = strings
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.strings.raw(self.order[i])
+
+
+def readImdb(path, types):
+    """Yield (imdbID, title, year, type, poster) from an IMDb title.basics TSV"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as file:
+        for row in csv.DictReader(file, delimiter="\t", quoting=csv.QUOTE_NONE):
+            kind = IMDB_TYPES.get(row["titleType"])
+            if kind not in types:
+                continue
+            start, end = row["startYear"], row.get("endYear", r"\N")
+            year = "" if start == r"\N" else start
+            if kind == "series" and year:
+                year += "–" + ("" if end == r"\N" else end)
+            yield row["tconst"], row["primaryTitle"], year, kind, "N/A"
+
+
+def readOmdb(path, types):
+    """Yield (imdbID, title, year, type, poster) from a JSONL file of OMDB records"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("Type") not in types:
+                continue
+            yield record["imdbID"], record["Title"], record.get("Year", ""), record["Type"], \
+                record.get("Poster", "N/A")
+
+
+def build(records, path):
+    """
+    Write a catalogue directory
+
+    Args:
+        records (iterable): (imdbID, title, year, type, poster) tuples
+        path (str): Output directory, created if missing
+
+    Returns:
+        int: Titles written
+    """
+    ids, titles, years, kinds, posters = [], [], [], [], []
+    for imdbID, title, year, kind, poster in records:
+        ids.append(int(imdbID[2:]))
+        titles.append(title)
+        years.append(year)
+        kinds.append(TYPES.index(kind))
+        posters.append(poster)
+    if not ids:
+        raise ValueError("No titles to index")
+
+    normalized = [normalizeTitle(title) for title in titles]
+    count = len(ids)
+    os.makedirs(path, exist_ok=True)
+
+    def save(name, array):
+        np.save(os.path.join(path, f"{name}.npy"), array)
+
+    save("ids", np.asarray(ids, dtype=np.uint32))
+    save("types", np.asarray(kinds, dtype=np.uint8))
+    for name, strings in (("titles", titles), ("years", years), ("posters", posters), ("normalized", normalized)):
+        blob, offsets = _pack(strings)
+        save(name, blob)
+        save(f"{name}Offsets", offsets)
+
+    # Sorting the UTF-8 bytes keeps code point order, which search() bisects
+    encoded = [title.encode("utf-8") for title in normalized]
+    save("prefixOrder", np.asarray(sorted(range(count), key=encoded.__getitem__), dtype=np.int32))
+
+    # Trigrams of all padded titles at once: codes at every position of the
+    # concatenated code points, minus those straddling two titles
+    padded = [f"  {title} " for title in normalized]
+    lengths = np.fromiter((len(title) for title in padded), dtype=np.int64, count=count)
+    points = _codepoints("".join(padded)).astype(np.uint64)
+    codes = (points[:-2] << np.uint64(42)) | (points[1:-1] << np.uint64(21)) | points[2:]
+    owners = np.repeat(np.arange(count, dtype=np.int32), lengths)[:-2]
+    ends = np.cumsum(lengths)
+    straddling = np.concatenate([ends - 2, ends - 1])
+    valid = np.ones(len(codes), dtype=bool)
+    valid[straddling[straddling < len(codes)]] = False
+    codes, owners = codes[valid], owners[valid]
+
+    order = np.lexsort((owners, codes))
+    codes, owners = codes[order], owners[order]
+    distinct = np.ones(len(codes), dtype=bool)
+    distinct[1:] = (codes[1:] != codes[:-1]) | (owners[1:] != owners[:-1])
+    codes, owners = codes[distinct], owners[distinct]
+
+    keys, starts = np.unique(codes, return_index=True)
+    save("trigramKeys", keys)
+    save("trigramOffsets", np.append(starts, len(codes)).astype(np.int64))
+    save("trigramPostings", owners)
+    save("trigramCounts", np.bincount(owners, minlength=count).astype(np.uint16))
+
+    with open(os.path.join(path, _META), "w", encoding="utf-8") as f:
+        json.dump({"titles": count, "trigrams": len(keys), "built": time.time()}, f)
+    return count
+
+
+class MovieCatalogue:
+    """
+    Read-only, memory-mapped title catalogue written by build()
+
+    Args:
+        path (str): Catalogue directory
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, _META), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.ids = load("ids")
+        self.types = load("types")
+        self.titles = _Strings(load("titles"), load("titlesOffsets"))
+        self.years = _Strings(load("years"), load("yearsOffsets"))
+        self.posters = _Strings(load("posters"), load("postersOffsets"))
+        self.normalized = _Strings(load("normalized"), load("normalizedOffsets"))
+        self.prefixOrder = load("prefixOrder")
+        self.trigramKeys = load("trigramKeys")
+        self.trigramOffsets = load("trigramOffsets")
+        self.trigramPostings = load("trigramPostings")
+        self.trigramCounts = load("trigramCounts")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _prefixMatches(self, normalized):
+        """Rows of titles whose normalized title starts with the query"""
+        query = normalized.encode("utf-8")
+        ordered = _SortedView(self.normalized, self.prefixOrder)
+        low = bisect.bisect_left(ordered, query)
+        high = bisect.bisect_left(ordered, query + b"\xff")
+        return np.asarray(self.prefixOrder[low:high], dtype=np.int64)
+
+    def _trigramMatches(self, normalized):
+        """
+        Titles holding at least MIN_COVERAGE of the query's trigrams
+
+        Returns:
+            tuple: (title rows, rank of each, lower is better). Ranks order
+            by the share of the query's trigrams a title holds, so a word of
+            a longer title still matches, then by the similarity of the
+            whole title to the query
+        """
+        codes = trigrams(normalized)
+        positions = np.searchsorted(self.trigramKeys, codes)
+        found = positions < len(self.trigramKeys)
+        found[found] = self.trigramKeys[positions[found]] == codes[found]
+        positions = positions[found]
+        if not len(positions):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        postings = np.concatenate([self.trigramPostings[self.trigramOffsets[i]:self.trigramOffsets[i + 1]]
+                                   for i in positions])
+        # Counting per title row is linear in the postings, unlike sorting them
+        shared = np.bincount(postings, minlength=len(self))
+        candidates = np.flatnonzero(shared >= MIN_COVERAGE * len(codes))
+        shared = shared[candidates]
+        similarity = shared / (len(codes) + self.trigramCounts[candidates] - shared)
+        # similarity < 1 unless equal, so shared decides first
+        return candidates, -(2 * shared + similarity)
+
+    def record(self, i):
+        """OMDB search record of a title"""
+        return {
+            "Title": self.titles[i],
+            "Year": self.years[i],
+            "imdbID": f"tt{int(self.ids[i]):07d}",
+            "Type": TYPES[self.types[i]],
+            "Poster": self.posters[i]
+        }
+
+    def search(self, query, limit=10):
+        """
+        Find titles by name
+
+        Args:
+            query (str): Title or part of it, misspellings allowed
+            limit (int): Most titles returned
+
+        Returns:
+            dict: Response in the shape of OMDB's ``s=`` search
+        """
+        normalized = normalizeTitle(query)
+        if not normalized:
+            return dict(_NOT_FOUND)
+
+        prefix = self._prefixMatches(normalized)
+        similar, ranks = self._trigramMatches(normalized)
+        inPrefix = np.zeros(len(self), dtype=bool)
+        inPrefix[prefix] = True
+        outside = ~inPrefix[similar]
+        similar, ranks = similar[outside], ranks[outside]
+        total = len(prefix) + len(similar)
+        if not total:
+            return dict(_NOT_FOUND)
+
+        # Prefix matches first, shortest title first, then the most similar
+        lengths = self.normalized.offsets[prefix + 1] - self.normalized.offsets[prefix]
+        matches = np.concatenate([prefix[_best(lengths, limit)], similar[_best(ranks, limit)]])[:limit]
+
+        return {
+            "Search": [self.record(i) for i in matches],
+            "totalResults": str(total),
+            "Response": "True"
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="IMDb title.basics TSV or JSONL of OMDB records, optionally gzipped")
+    parser.add_argument("output", help="catalogue directory")
+    parser.add_argument("--types", nargs="+", default=["movie", "series"], choices=TYPES,
+                        help="title types to include")
+    args = parser.parse_args()
+
+    reader = readOmdb if ".json" in os.path.basename(args.input) else readImdb
+    began = time.perf_counter()
+    count = build(reader(args.input, set(args.types)), args.output)
+    print(f"Indexed {count} titles in {time.perf_counter() - began:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import instrumentation
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` calls per second with bursts of ``burst``"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        if not self.rate:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class OmdbClient:
+    """
+    OMDB API client sharing one keep-alive session between threads
+
+    Args:
+        baseURL (str): OMDB endpoint
+        apiKey (str): OMDB API key
+        maxWorkers (int): Concurrent requests used by mapConcurrent
+        timeout (tuple): (connect, read) timeout in seconds for each request
+        retries (int): Retries for connection errors and 429/5xx responses
+        backoff (float): Exponential backoff factor between retries
+        rate (float): Maximum requests per second, 0 to disable
+    """
+
+    def __init__(self, baseURL, apiKey, maxWorkers=8, timeout=(3.05, 10), retries=3, backoff=0.3, rate=20):
+        self.baseURL = baseURL
+        self.apiKey = apiKey
+        self.maxWorkers = maxWorkers
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",)
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=maxWorkers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="omdb")
+
+    def get(self, **params):
+        """Send one GET request and return the parsed JSON body"""
+        self.limiter.acquire()
+        with instrumentation.span("http.omdb"):
+            response = self.session.get(
+                f"{self.baseURL}/",
+                params={**params, "apikey": self.apiKey},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+
+    def search(self, query):
+        """Search titles by name"""
+        return self.get(s=query)
+
+    def details(self, imdbID):
+        """Fetch the full record of one title"""
+        return self.get(i=imdbID)
+
+    def mapConcurrent(self, fn, items):
+        """
+        Apply fn to every item on the client's thread pool
+
+        Args:
+            fn (callable): Called with one item, typically issuing a request
+            items (iterable): Inputs
+
+        Returns:
+            list: Results in input order; a call that raised contributes its
+            exception instead of a result
+        """
+        futures = [self._executor.submit(fn, item) for item in items]
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def mapCompleted(self, fn, items):
+        """
+        Apply fn to every item on the client's thread pool, yielding results
+        as soon as each call finishes
+
+        Yields:
+            tuple: (index of the item, result), in completion order; a call
+            that raised yields its exception instead of a result
+        """
+        futures = {self._executor.submit(fn, item): i for i, item in enumerate(items)}
+
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
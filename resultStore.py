@@ -0,0 +1,288 @@
+"""
+Append-only columnar store of scored reviews
+
+Every scored review is one row spread over fixed-width column files, one
+file per column, opened as NumPy memmaps:
+
+    movie.u4     row of the imdbID in the index's movie table
+    backend.u1   row of the backend in BACKENDS
+    hash.u8      first 8 bytes of the sha256 of the normalized review text
+    label.u1     results.Label code
+    score.f4     result score
+    scores.f4    results.WIDTH result scores in the order of results.FIELDS, NaN padded
+
+The index is an append-only JSON lines log, one line per append naming
+the imdbID, backend and row range it added, replayed into a dict when the
+store opens. A movie's distribution is read from slices of the memmaps
+without loading or parsing anything else. Columns are written before their
+index line, so a crash loses at most the rows of the interrupted append.
+One process writes a store at a time; threads share it under one lock.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+import aggregates
+import caching
+import modals
+import results
+
+# Backend column values
+BACKENDS = tuple(modals.BACKENDS)
+
+# Column name -> (dtype, values per row)
+COLUMNS = {
+    "movie": (np.uint32, 1),
+    "backend": (np.uint8, 1),
+    "hash": (np.uint64, 1),
+    "label": (np.uint8, 1),
+    "score": (np.float32, 1),
+    "scores": (np.float32, results.WIDTH)
+}
+
+_INDEX = "index.jsonl"
+
+
+def reviewHash(text):
+    """64-bit content hash of a review, after the result cache's normalization"""
+    digest = hashlib.sha256(caching.normalizeText(text).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def _seriesKey(imdbID, backend):
+    return f"{imdbID}|{backend}"
+
+
+class ResultStore:
+    """
+    Memory-mapped columns of scored reviews, indexed by imdbID and backend
+
+    Args:
+        path (str): Directory of the column files, created if missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        # Reentrant, as reads made during an append take it again
+        self._lock = threading.RLock()
+        self._maps = {}
+
+        self.rowCount = 0
+        self.movies = []
+        self.series = {}
+        self._movieIds = {}
+
+        indexPath = os.path.join(path, _INDEX)
+        if os.path.exists(indexPath):
+            with open(indexPath, "r+b") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        entry = None
+                    if entry is None:
+                        # Line cut short by a crash; it and its rows are dropped
+                        f.truncate(offset)
+                        break
+                    self._replay(entry)
+                    offset += len(line)
+
+        # Drop rows of an append that never made it into the index
+        for name, (dtype, width) in COLUMNS.items():
+            columnPath = self._columnPath(name)
+            size = self.rowCount * width * np.dtype(dtype).itemsize
+            if not os.path.exists(columnPath):
+                open(columnPath, "wb").close()
+            elif os.path.getsize(columnPath) > size:
+                with open(columnPath, "r+b") as f:
+                    f.truncate(size)
+        self._index = open(indexPath, "a", encoding="utf-8")
+
+    def _columnPath(self, name):
+        dtype, _ = COLUMNS[name]
+        return os.path.join(self.path, f"{name}.{np.dtype(dtype).str[1:]}")
+
+    def _internMovie(self, imdbID):
+        movie = self._movieIds.get(imdbID)
+        if movie is None:
+            movie = self._movieIds[imdbID] = len(self.movies)
+            self.movies.append(imdbID)
+        return movie
+
+    def _replay(self, entry):
+        """Apply one index line to the in-memory index"""
+        self._internMovie(entry["movie"])
+
+        key = _seriesKey(entry["movie"], entry["backend"])
+        series = self.series.get(key)
+        if series is None or series["version"] != entry["version"]:
+            series = self.series[key] = {"version": entry["version"], "segments": []}
+        series["segments"].append((entry["start"], entry["count"]))
+        self.rowCount = entry["start"] + entry["count"]
+
+    def column(self, name):
+        """Read-only memmap of a whole column, remapped when rows were appended"""
+        dtype, width = COLUMNS[name]
+        with self._lock:
+            rows = self.rowCount
+            cached = self._maps.get(name)
+            if cached is not None and cached[0] == rows:
+                return cached[1]
+
+            shape = (rows, width) if width > 1 else (rows,)
+            if rows == 0:
+                array = np.zeros(shape, dtype=dtype)
+            else:
+                array = np.memmap(self._columnPath(name), dtype=dtype, mode="r", shape=shape)
+            self._maps[name] = (rows, array)
+            return array
+
+    def has(self, imdbID, backend, version=""):
+        """Whether results of a movie were stored for this backend and version"""
+        with self._lock:
+            entry = self.series.get(_seriesKey(imdbID, backend.lower()))
+            return entry is not None and entry["version"] == version
+
+    def _segments(self, imdbID, backend, version):
+        """Copy of a series' row ranges, taken under the lock"""
+        with self._lock:
+            entry = self.series.get(_seriesKey(imdbID, backend.lower()))
+            return list(entry["segments"]) if entry is not None and entry["version"] == version else []
+
+    def _slice(self, name, segments):
+        array = self.column(name)
+        parts = [array[start:start + count] for start, count in segments]
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else array[:0]
+
+    def rows(self, imdbID, backend, version=""):
+        """
+        Stored rows of a movie and backend
+
+        Args:
+            imdbID (str): Movie id
+            backend (str): Package name
+            version (str): Version the rows must have been stored under
+
+        Returns:
+            dict: Column name -> array. Memmap slices when the rows were
+            appended at once, copies when they span several appends
+        """
+        with self._lock:
+            segments = self._segments(imdbID, backend, version)
+            return {name: self._slice(name, segments) for name in COLUMNS}
+
+    def aggregate(self, imdbID, backend, version=""):
+        """Label distribution of a movie's stored results as a SentimentAggregate"""
+        with self._lock:
+            segments = self._segments(imdbID, backend, version)
+            labels, scores = self._slice("label", segments), self._slice("score", segments)
+        return aggregates.SentimentAggregate().updateCodes(list(results.Label), labels, scores)
+
+    def append(self, imdbID, backend, texts, scored, version=""):
+        """
+        Store the results of a movie's reviews
+
+        Every review is stored, duplicates included, so a stored distribution
+        matches the one computed when the movie is scored fresh. Appending
+        under the stored version adds rows (appendIfMissing does not);
+        storing under a new version starts the movie and backend over, and
+        the rows of the old version stay in the files but are no longer
+        indexed.
+
+        Args:
+            imdbID (str): Movie id
+            backend (str): Package name
+            texts (list): Reviews
+            scored (list): results.Result of each review
+            version (str): Model and settings the results were produced with
+
+        Returns:
+            int: Rows appended
+        """
+        key = backend.lower()
+        if not texts:
+            return 0
+        hashes = np.fromiter((reviewHash(text) for text in texts), dtype=np.uint64, count=len(texts))
+
+        with self._lock:
+            knownMovies = len(self.movies)
+            try:
+                entry = self._write(imdbID, key, hashes, results.toArray(scored), version)
+            except BaseException:
+                # Forget a movie code handed out for rows that were never indexed
+                for movie in self.movies[knownMovies:]:
+                    del self._movieIds[movie]
+                del self.movies[knownMovies:]
+                raise
+            self._replay(entry)
+            return len(texts)
+
+    def appendIfMissing(self, imdbID, backend, texts, scored, version=""):
+        """
+        Store the results of a movie's reviews unless the movie and backend
+        are already stored under this version
+
+        The check and the append happen under one lock, so sessions scoring
+        the same movie at once store it only once.
+
+        Returns:
+            int: Rows appended, 0 when the movie was already stored
+        """
+        with self._lock:
+            if self.has(imdbID, backend, version):
+                return 0
+            return self.append(imdbID, backend, texts, scored, version)
+
+    def _write(self, imdbID, key, hashes, packed, version):
+        """Write rows at the end of the columns, then their index line"""
+        count = len(packed)
+        values = {
+            "movie": np.full(count, self._internMovie(imdbID), dtype=np.uint32),
+            "backend": np.full(count, BACKENDS.index(key), dtype=np.uint8),
+            "hash": hashes,
+            "label": packed["label"],
+            "score": packed["score"].astype(np.float32),
+            "scores": packed["scores"].astype(np.float32)
+        }
+        for name, array in values.items():
+            # Written at the indexed end, over whatever a failed append left
+            dtype, width = COLUMNS[name]
+            with open(self._columnPath(name), "r+b") as f:
+                f.seek(self.rowCount * width * np.dtype(dtype).itemsize)
+                f.write(np.ascontiguousarray(array).tobytes())
+                f.truncate()
+
+        entry = {
+            "movie": imdbID,
+            "backend": key,
+            "version": version,
+            "start": self.rowCount,
+            "count": count
+        }
+        self._index.write(json.dumps(entry) + "\n")
+        self._index.flush()
+        return entry
+
+    def __len__(self):
+        return self.rowCount
+
+    def close(self):
+        """Close the index log; the store can no longer be appended to"""
+        self._index.close()
+
+    def stats(self):
+        """Row, movie and series counts and the size of the column files"""
+        with self._lock:
+            return {
+                "rows": self.rowCount,
+                "movies": len(self.movies),
+                "series": len(self.series),
+                "bytes": sum(os.path.getsize(self._columnPath(name)) for name in COLUMNS)
+            }
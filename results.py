@@ -0,0 +1,208 @@
+"""
+Result type shared by every text backend
+
+A Result holds the label as a Label code, the runner-up emotion when
+text2emotion finds two close ones, the score and the backend's score vector
+in the order of FIELDS. Aggregation, caching and storage work on those codes
+and floats; label text is only produced by labelName, Result.labelText and
+Result.toDict, where results are shown or sent out. Batches convert to a
+NumPy structured array of RESULT_DTYPE and back.
+"""
+from enum import IntEnum
+import math
+
+import numpy as np
+
+
+class Label(IntEnum):
+    NEGATIVE = 0
+    NEUTRAL = 1
+    POSITIVE = 2
+    HAPPY = 3
+    ANGRY = 4
+    SURPRISE = 5
+    SAD = 6
+    FEAR = 7
+    # Flair is not installed
+    UNAVAILABLE = 8
+
+
+# Label of each text2emotion emotion
+EMOTION_LABELS = {
+    "Happy": Label.HAPPY,
+    "Angry": Label.ANGRY,
+    "Surprise": Label.SURPRISE,
+    "Sad": Label.SAD,
+    "Fear": Label.FEAR
+}
+
+# Score vector fields of each backend, in order
+FIELDS = {
+    "flair": ("POSITIVE", "NEGATIVE"),
+    "textblob": ("polarity", "subjectivity"),
+    "vader": ("neg", "neu", "pos", "compound"),
+    "text2emotion": tuple(EMOTION_LABELS)
+}
+WIDTH = max(len(fields) for fields in FIELDS.values())
+
+# Part of every cache key; bump when the pickled form of Result changes so
+# results cached in an older form are not read back
+FORMAT = 1
+
+# Missing second label in RESULT_DTYPE arrays
+NO_LABEL = 255
+
+RESULT_DTYPE = np.dtype([
+    ("label", np.uint8),
+    ("secondary", np.uint8),
+    ("score", np.float64),
+    ("scores", np.float64, (WIDTH,))
+])
+
+
+def labelName(label, backend):
+    """Display text of a label code as the backend has always shown it"""
+    label = Label(label)
+    if label is Label.UNAVAILABLE:
+        return "NEUTRAL - Flair not available"
+    if backend == "flair":
+        return label.name
+    return label.name.title()
+
+
+# Flair predictions below this confidence are reported as NEUTRAL
+FLAIR_NEUTRAL_THRESHOLD = 0.60
+
+
+def flairLabel(value, confidence):
+    """Map a Flair label value and its confidence to POSITIVE/NEGATIVE/NEUTRAL"""
+    if confidence < FLAIR_NEUTRAL_THRESHOLD:
+        return Label.NEUTRAL
+    return Label[value]
+
+
+def polarityLabel(polarity):
+    """Map a TextBlob polarity to Positive/Negative/Neutral"""
+    if polarity > 0:
+        return Label.POSITIVE
+    elif polarity == 0:
+        return Label.NEUTRAL
+    else:
+        return Label.NEGATIVE
+
+
+def compoundLabel(compound):
+    """Map a VADER compound score to Positive/Negative/Neutral"""
+    if compound >= 0.05:
+        return Label.POSITIVE
+    elif compound <= -0.05:
+        return Label.NEGATIVE
+    else:
+        return Label.NEUTRAL
+
+
+def emotionLabel(emotion):
+    """Dominant emotion of a text2emotion distribution and the runner-up when it is close, else None"""
+    emotion = sorted(emotion.items(), key=lambda kv: (kv[1], kv[0]), reverse=True)
+
+    secondary = None
+    if emotion[1][1] >= 0.5 or emotion[1][1] == emotion[0][1]:
+        secondary = EMOTION_LABELS[emotion[1][0]]
+
+    return EMOTION_LABELS[emotion[0][0]], secondary
+
+
+class Result:
+    """
+    One text's result
+
+    Args:
+        backend (str): Lower-cased backend name
+        label (Label): Label code
+        score (float): Confidence, polarity or dominant emotion share
+        scores (tuple): Score vector in the order of FIELDS[backend], NaN
+            for fields the result does not have
+        secondary (Label): Runner-up emotion, or None
+    """
+
+    __slots__ = ("backend", "label", "score", "scores", "secondary")
+
+    def __init__(self, backend, label, score, scores=(), secondary=None):
+        self.backend = backend
+        self.label = Label(label)
+        self.score = float(score)
+        self.scores = tuple(scores) or (math.nan,) * len(FIELDS[backend])
+        self.secondary = None if secondary is None else Label(secondary)
+
+    @classmethod
+    def fromScores(cls, backend, label, score, values, secondary=None):
+        """Build a result from a field -> value mapping"""
+        scores = tuple(float(values[field]) if field in values else math.nan for field in FIELDS[backend])
+        return cls(backend, label, score, scores, secondary)
+
+    def get(self, field, default=None):
+        """Value of a score field, or default when the result lacks it"""
+        fields = FIELDS[self.backend]
+        if field not in fields:
+            return default
+        value = self.scores[fields.index(field)]
+        return default if math.isnan(value) else value
+
+    def scoreDict(self):
+        """Field -> value of the fields the result has"""
+        return {field: value for field, value in zip(FIELDS[self.backend], self.scores) if not math.isnan(value)}
+
+    def labelText(self):
+        """Label as displayed, e.g. "Happy - Sad" for two close emotions"""
+        text = labelName(self.label, self.backend)
+        if self.secondary is not None:
+            text += " - " + labelName(self.secondary, self.backend)
+        return text
+
+    def toDict(self):
+        """JSON-compatible form with the label rendered"""
+        return {"label": self.labelText(), "score": self.score, "scores": self.scoreDict()}
+
+    def __eq__(self, other):
+        if not isinstance(other, Result):
+            return NotImplemented
+        return (self.backend, self.label, self.secondary, self.score) == \
+            (other.backend, other.label, other.secondary, other.score) and \
+            np.array_equal(self.scores, other.scores, equal_nan=True)
+
+    def __getstate__(self):
+        return self.backend, int(self.label), self.score, self.scores, \
+            None if self.secondary is None else int(self.secondary)
+
+    def __setstate__(self, state):
+        backend, label, score, scores, secondary = state
+        self.backend = backend
+        self.label = Label(label)
+        self.score = score
+        self.scores = scores
+        self.secondary = None if secondary is None else Label(secondary)
+
+    def __repr__(self):
+        return f"Result({self.backend}, {self.labelText()}, {self.score:.4f})"
+
+
+def toArray(results):
+    """Pack results of one backend into a RESULT_DTYPE structured array"""
+    array = np.zeros(len(results), dtype=RESULT_DTYPE)
+    array["scores"] = np.nan
+    if results:
+        array["scores"][:, :len(results[0].scores)] = [result.scores for result in results]
+    array["label"] = [result.label for result in results]
+    array["secondary"] = [NO_LABEL if result.secondary is None else result.secondary for result in results]
+    array["score"] = [result.score for result in results]
+    return array
+
+
+def fromArray(backend, array):
+    """Unpack a RESULT_DTYPE array of one backend into results"""
+    width = len(FIELDS[backend])
+    return [
+        Result(backend, label, score, tuple(scores[:width]), None if secondary == NO_LABEL else secondary)
+        for label, secondary, score, scores in zip(array["label"].tolist(), array["secondary"].tolist(),
+                                                   array["score"].tolist(), array["scores"].tolist())
+    ]
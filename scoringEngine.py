@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import aggregates
+import modals
+import results
+
+
+def _initWorker(backend, threadsPerWorker):
+    """Load the backend's model in a worker, unless it was inherited by fork"""
+    if "torch" in sys.modules:
+        # Several workers each running a full-width torch pool oversubscribe the CPU
+        sys.modules["torch"].set_num_threads(threadsPerWorker)
+    modals.getModel(backend)
+
+
+def _scoreChunk(texts, backend, batchSize):
+    start = time.perf_counter()
+    scored = modals.analyzeBatch(texts, backend, batchSize=batchSize, useCache=False)
+    # One structured array pickles far smaller than a list of objects
+    return results.toArray(scored), os.getpid(), time.perf_counter() - start
+
+
+def _aggregateChunk(texts, backend, batchSize):
+    start = time.perf_counter()
+    scored = modals.analyzeBatch(texts, backend, batchSize=batchSize, useCache=False)
+    aggregate = aggregates.SentimentAggregate().update(scored)
+    return aggregate.toBytes(), os.getpid(), time.perf_counter() - start
+
+
+class ScoringEngine:
+    """
+    Process pool that scores texts with one modals backend on every core
+
+    The model is loaded in the parent before the pool starts, so with the
+    fork start method every worker shares its pages copy-on-write instead of
+    loading its own; with spawn each worker loads it once at start-up.
+    Texts are split into chunks, and results come back in input order.
+
+    Args:
+        backend (str): Package name (Flair/TextBlob/Vader/Text2emotion)
+        workers (int): Worker processes, one per CPU by default
+        chunkSize (int): Texts sent to a worker at a time
+        batchSize (int): Texts per model call inside a worker
+        startMethod (str): multiprocessing start method, fork where available.
+            Fork only from a single-threaded process such as bulkScore
+    """
+
+    def __init__(self, backend, workers=None, chunkSize=256, batchSize=modals.DEFAULT_BATCH_SIZE,
+                 startMethod=None):
+        self.backend = backend.lower()
+        if self.backend not in modals.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.chunkSize = chunkSize
+        self.batchSize = batchSize
+        self.workerStats = {}
+
+        if startMethod is None:
+            startMethod = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        if startMethod == "fork":
+            modals.getModel(self.backend)
+
+        threadsPerWorker = max(1, (os.cpu_count() or 1) // self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(startMethod),
+            initializer=_initWorker,
+            initargs=(self.backend, threadsPerWorker)
+        )
+        self._statsLock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _record(self, pid, count, seconds):
+        with self._statsLock:
+            stats = self.workerStats.setdefault(pid, {"texts": 0, "seconds": 0.0})
+            stats["texts"] += count
+            stats["seconds"] += seconds
+
+    def _map(self, function, texts):
+        """
+        Run function over chunks of texts on the pool, yielding each chunk's
+        payload in input order
+
+        At most two chunks per worker are in flight, so memory stays bounded
+        for arbitrarily long inputs.
+        """
+        iterator = iter(texts)
+        pending = deque()
+
+        def submit():
+            chunk = list(islice(iterator, self.chunkSize))
+            if chunk:
+                pending.append((len(chunk), self._executor.submit(
+                    function, chunk, self.backend, self.batchSize)))
+            return bool(chunk)
+
+        while len(pending) < 2 * self.workers and submit():
+            pass
+
+        while pending:
+            count, future = pending.popleft()
+            payload, pid, seconds = future.result()
+            self._record(pid, count, seconds)
+            submit()
+            yield payload
+
+    def imap(self, texts):
+        """
+        Score an iterable of texts lazily, with a bounded number of chunks in flight
+
+        Yields:
+            results.Result: One result per text, in input order
+        """
+        for packed in self._map(_scoreChunk, texts):
+            yield from results.fromArray(self.backend, packed)
+
+    def score(self, texts):
+        """Score texts and return the results as a list, in input order"""
+        return list(self.imap(texts))
+
+    def aggregate(self, texts):
+        """
+        Score texts and return only their label distribution
+
+        Each worker aggregates its own chunks and sends back the serialized
+        partial aggregate instead of per-text results.
+
+        Returns:
+            aggregates.SentimentAggregate: Merged distribution of all texts
+        """
+        total = aggregates.SentimentAggregate()
+        for payload in self._map(_aggregateChunk, texts):
+            total.merge(aggregates.SentimentAggregate.fromBytes(payload))
+        return total
+
+    def throughput(self):
+        """Return texts per second of scoring time for each worker pid"""
+        with self._statsLock:
+            return {
+                pid: stats["texts"] / stats["seconds"] if stats["seconds"] else 0.0
+                for pid, stats in self.workerStats.items()
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_engines = {}
+_enginesLock = threading.Lock()
+
+
+def sharedEngine(backend, workers=None):
+    """
+    Return the process-wide engine for a backend, starting it on first use
+
+    Shared engines are started from app threads while other threads may hold
+    locks or run thread pools, which a forked child would inherit in an
+    unusable state, so they never fork; workers start from the forkserver
+    where available, else by spawn, and load the model themselves.
+    """
+    key = (backend.lower(), workers)
+    with _enginesLock:
+        if key not in _engines:
+            startMethod = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _engines[key] = ScoringEngine(backend, workers=workers, startMethod=startMethod)
+        return _engines[key]
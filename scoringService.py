@@ -0,0 +1,285 @@
+"""
+HTTP scoring service exposing the modals backends as a JSON/NDJSON API
+
+A plain ASGI application, so it runs under any ASGI server:
+
+    uvicorn scoringService:app --port 8000
+    python scoringService.py --port 8000 --backends Vader TextBlob
+
+Endpoints:
+    GET  /health                liveness, always 200
+    GET  /ready                 200 once the preloaded backends are loaded, 503 before
+    GET  /metrics               instrumentation metrics in Prometheus text format
+    GET  /stats                 micro-batching counters per backend
+    POST /v1/score              {"backend": "Vader", "texts": [...]} or {"backend": ..., "text": "..."}
+                                -> {"results": [{"label", "score", "scores"}, ...]}
+    POST /v1/score/stream?backend=Vader
+                                NDJSON body, one {"id": ..., "text": ...} (or a bare
+                                JSON string) per line -> NDJSON results, streamed back
+                                chunk by chunk while the body is still being read. A
+                                malformed line ends the stream after the lines before
+                                it with {"error": ..., "line": n}
+
+Requests of up to SERVICE_MAX_BATCH texts are queued on a per-backend
+BatchScheduler, so concurrent small requests share one model call; larger
+ones are scored directly in chunks. Models are the same lazily loaded
+singletons the UI uses.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+from urllib.parse import parse_qs
+
+import batchScheduler
+import instrumentation
+import modals
+
+logger = logging.getLogger(__name__)
+
+# Backends loaded at start-up and required by /ready
+SERVICE_BACKENDS = [name.strip().lower() for name in os.environ.get("SERVICE_BACKENDS", "vader").split(",")
+                    if name.strip()]
+
+# Largest request scored through the micro-batching scheduler, and the
+# longest a queued text waits for others
+SERVICE_MAX_BATCH = int(os.environ.get("SERVICE_MAX_BATCH", modals.DEFAULT_BATCH_SIZE))
+SERVICE_MAX_WAIT = float(os.environ.get("SERVICE_MAX_WAIT", 0.005))
+
+# Lines of an NDJSON stream scored together
+STREAM_CHUNK = 256
+
+_schedulers = {}
+
+
+def scheduler(key):
+    """Return the shared scheduler of a backend, creating it on first use"""
+    if key not in _schedulers:
+        _schedulers[key] = batchScheduler.BatchScheduler(key, maxBatch=SERVICE_MAX_BATCH, maxWait=SERVICE_MAX_WAIT)
+        instrumentation.registerCollector(f"service.batch.{key}", _schedulers[key].stats)
+    return _schedulers[key]
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _backendKey(name):
+    key = (name or "").lower()
+    if key not in modals.BACKENDS:
+        raise HTTPError(400, f"Unknown backend: {name}")
+    if key == "flair" and not modals.FLAIR_AVAILABLE:
+        raise HTTPError(400, "Flair is not installed")
+    return key
+
+
+async def _score(key, texts):
+    """Score texts, micro-batched when the request is small"""
+    if len(texts) <= SERVICE_MAX_BATCH:
+        futures = scheduler(key).submitMany(texts)
+        return list(await asyncio.gather(*(asyncio.wrap_future(future) for future in futures)))
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, modals.analyzeBatch, texts, key)
+
+
+async def _readBody(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send(send, status, body, contentType="application/json"):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", contentType.encode("ascii")),
+                    (b"content-length", str(len(body)).encode("ascii"))]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def scoreEndpoint(scope, receive, send):
+    try:
+        payload = json.loads(await _readBody(receive) or b"{}")
+    except ValueError:
+        raise HTTPError(400, "Body must be JSON")
+    if not isinstance(payload, dict):
+        raise HTTPError(400, "Body must be a JSON object")
+
+    key = _backendKey(payload.get("backend"))
+    texts = payload["texts"] if "texts" in payload else [payload.get("text")]
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise HTTPError(400, "texts must be a list of strings")
+
+    with instrumentation.span("service.score"):
+        results = await _score(key, texts)
+    instrumentation.increment("service.texts", len(texts))
+    await _send(send, 200, {"backend": key, "results": [result.toDict() for result in results]})
+
+
+def _parseLine(line, number):
+    try:
+        item = json.loads(line)
+    except ValueError:
+        raise HTTPError(400, f"Line {number} is not JSON")
+    if isinstance(item, str):
+        return number, item
+    if isinstance(item, dict) and isinstance(item.get("text"), str):
+        return item.get("id", number), item["text"]
+    raise HTTPError(400, f"Line {number} has no text")
+
+
+async def streamEndpoint(scope, receive, send):
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    key = _backendKey(query.get("backend", [""])[0])
+    loop = asyncio.get_running_loop()
+
+    started = False
+    buffer = b""
+    pending = []
+    number = 0
+
+    async def flush():
+        nonlocal started, pending
+        if not started:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")]
+            })
+            started = True
+        if pending:
+            ids = [itemId for itemId, _ in pending]
+            texts = [text for _, text in pending]
+            pending = []
+            with instrumentation.span("service.stream.chunk"):
+                results = await loop.run_in_executor(None, modals.analyzeBatch, texts, key)
+            instrumentation.increment("service.texts", len(texts))
+            lines = "".join(json.dumps({"id": itemId, **result.toDict()}) + "\n"
+                            for itemId, result in zip(ids, results))
+            await send({"type": "http.response.body", "body": lines.encode("utf-8"), "more_body": True})
+
+    try:
+        while True:
+            message = await receive()
+            buffer += message.get("body", b"")
+            more = message.get("more_body", False)
+
+            *lines, buffer = buffer.split(b"\n")
+            if not more and buffer:
+                lines.append(buffer)
+                buffer = b""
+            for line in lines:
+                if line.strip():
+                    number += 1
+                    try:
+                        pending.append(_parseLine(line, number))
+                    except HTTPError as e:
+                        if not started and not pending:
+                            raise
+                        # Lines before the malformed one are still scored and sent
+                        await flush()
+                        error = json.dumps({"error": str(e), "line": number}) + "\n"
+                        await send({"type": "http.response.body", "body": error.encode("utf-8"), "more_body": True})
+                        await send({"type": "http.response.body", "body": b""})
+                        return
+                    if len(pending) >= STREAM_CHUNK:
+                        await flush()
+            if not more:
+                break
+        await flush()
+    except Exception as e:
+        if not started:
+            raise
+        if not isinstance(e, HTTPError):
+            logger.exception("Stream scoring with %s failed", key)
+        # Headers are gone; report the error as the last line
+        error = json.dumps({"error": str(e)}) + "\n"
+        await send({"type": "http.response.body", "body": error.encode("utf-8"), "more_body": True})
+
+    await send({"type": "http.response.body", "body": b""})
+
+
+def isReady():
+    return all(modals.isLoaded(key) for key in SERVICE_BACKENDS)
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Models load in the background; /ready reports when they are done
+                modals.warmUp(SERVICE_BACKENDS)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for instance in _schedulers.values():
+                    instance.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"]
+    try:
+        if path == "/health" and method == "GET":
+            await _send(send, 200, {"status": "ok"})
+        elif path == "/ready" and method == "GET":
+            modals.warmUp(SERVICE_BACKENDS)
+            ready = isReady()
+            await _send(send, 200 if ready else 503, {
+                "ready": ready,
+                "backends": {key: modals.isLoaded(key) for key in SERVICE_BACKENDS}
+            })
+        elif path == "/metrics" and method == "GET":
+            await _send(send, 200, instrumentation.renderPrometheus().encode("utf-8"),
+                        "text/plain; version=0.0.4")
+        elif path == "/stats" and method == "GET":
+            await _send(send, 200, {key: instance.stats() for key, instance in _schedulers.items()})
+        elif path == "/v1/score" and method == "POST":
+            await scoreEndpoint(scope, receive, send)
+        elif path == "/v1/score/stream" and method == "POST":
+            await streamEndpoint(scope, receive, send)
+        elif path in ("/health", "/ready", "/metrics", "/stats", "/v1/score", "/v1/score/stream"):
+            raise HTTPError(405, "Method not allowed")
+        else:
+            raise HTTPError(404, "Not found")
+    except HTTPError as e:
+        await _send(send, e.status, {"error": str(e)})
+    except Exception as e:
+        logger.exception("Request to %s failed", path)
+        await _send(send, 500, {"error": str(e)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--backends", nargs="+", help="backends to preload, SERVICE_BACKENDS by default")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("uvicorn") is None:
+        raise SystemExit("uvicorn is not installed; pip install uvicorn, or serve scoringService:app "
+                         "with another ASGI server")
+    import uvicorn
+
+    if args.backends:
+        SERVICE_BACKENDS[:] = [name.lower() for name in args.backends]
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING"))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
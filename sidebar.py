@@ -1,7 +1,17 @@
+import os
 import streamlit as st
 from streamlit_option_menu import option_menu
 
+# Set SHOW_DIAGNOSTICS=1 to add the Diagnostics page to the menu
+showDiagnostics = os.environ.get("SHOW_DIAGNOSTICS", "") not in ("", "0")
+
 def show():
+    options = ["Text", "Movie Analysis", "Image"]
+    icons = ["card-text", "film", "image"]
+    if showDiagnostics:
+        options.append("Diagnostics")
+        icons.append("speedometer2")
+    
     with st.sidebar:
         st.markdown("""
         # Applications
@@ -9,8 +19,8 @@ def show():
         
         selected = option_menu(
             menu_title=None,  # required
-            options=["Text", "Movie Analysis", "Image"],  # required
-            icons=["card-text", "film", "image"],  # optional
+            options=options,  # required
+            icons=icons,  # optional
             default_index=0,  # optional
         )
         
@@ -0,0 +1,14 @@
+import batchScheduler
+
+
+def test_cancelled_future_does_not_stop_the_worker():
+    scheduler = batchScheduler.BatchScheduler("Vader", maxWait=0.2)
+    try:
+        cancelled = scheduler.submit("good")
+        assert cancelled.cancel()
+
+        # Queued after the cancelled text; scored once the worker drops it
+        assert scheduler.submit("good").result(timeout=10).label.name == "POSITIVE"
+        assert scheduler.submit("bad").result(timeout=10).label.name == "NEGATIVE"
+    finally:
+        scheduler.close()
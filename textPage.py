@@ -1,10 +1,25 @@
+import io
+
 import streamlit as st
 import streamlit.components.v1 as components
-from textblob import TextBlob
 from PIL import Image
-import text2emotion as te
+import pandas as pd
 import plotly.graph_objects as go
 
+import aggregates
+import batchScheduler
+import modals
+from results import Label, labelName
+
+TEXTBLOB = 'Positive/Negative/Neutral - TextBlob'
+TEXT2EMOTION = 'Happy/Sad/Angry/Fear/Surprise - text2emotion'
+
+# Backend behind each type of analysis
+BACKEND_OF = {TEXTBLOB: "TextBlob", TEXT2EMOTION: "Text2emotion"}
+
+# Most lines scored from one multi-line input or file
+MAX_LINES = 5000
+
 
 def plotPie(labels, values):
     fig = go.Figure(
@@ -19,21 +34,16 @@ def plotPie(labels, values):
 
 
 def getPolarity(userText):
-    tb = TextBlob(userText)
-    polarity = round(tb.polarity, 2)
-    subjectivity = round(tb.subjectivity, 2)
-    
-    if polarity > 0:
-        return polarity, subjectivity, "Positive"
-    elif polarity == 0:
-        return polarity, subjectivity, "Neutral"
-    else:
-        return polarity, subjectivity, "Negative"
+    # One analyzer pass gives polarity, subjectivity and the label; the text
+    # is queued with other sessions' texts and scored in one batch
+    result = batchScheduler.sharedScheduler("TextBlob").score(userText)
+    return result.score, round(result.get("subjectivity"), 2), result.label
 
 
 def getSentiments(userText, type):
-    if type == 'Positive/Negative/Neutral - TextBlob':
-        polarity, subjectivity, status = getPolarity(userText)
+    if type == TEXTBLOB:
+        polarity, subjectivity, label = getPolarity(userText)
+        status = labelName(label, "textblob")
         
         # Display metrics
         col1, col2, col3 = st.columns(3)
@@ -42,15 +52,15 @@ def getSentiments(userText, type):
         col3.metric("Result", status, None)
         
         # Display appropriate emoji or message
-        if status == "Positive":
+        if label is Label.POSITIVE:
             st.success(f"😊 {status} sentiment detected!")
-        elif status == "Negative":
+        elif label is Label.NEGATIVE:
             st.error(f"😞 {status} sentiment detected!")
         else:
             st.info(f"😐 {status} sentiment detected!")
     
-    elif type == 'Happy/Sad/Angry/Fear/Surprise - text2emotion':
-        emotion = dict(te.get_emotion(userText))
+    elif type == TEXT2EMOTION:
+        emotion = batchScheduler.sharedScheduler("Text2emotion").score(userText).scoreDict()
         
         col1, col2, col3, col4, col5 = st.columns(5)
         col1.metric("Happy 😊", emotion['Happy'], None)
@@ -62,6 +72,78 @@ def getSentiments(userText, type):
         plotPie(list(emotion.keys()), list(emotion.values()))
 
 
+def readCsv(data, **kwargs):
+    """Parse a UTF-8 .csv upload, or show an error and return None when it is not valid"""
+    try:
+        return pd.read_csv(io.BytesIO(data), encoding="utf-8", **kwargs)
+    except UnicodeDecodeError:
+        st.error("The CSV file is not UTF-8 encoded. Please save it as UTF-8 and upload it again.")
+    except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        st.error(f"Could not read the CSV file: {str(e)}")
+    return None
+
+
+def readLines(uploaded, column=None):
+    """Non-empty lines of a .txt upload, or one column of a .csv upload"""
+    data = uploaded.getvalue()
+    if uploaded.name.lower().endswith(".csv"):
+        frame = readCsv(data)
+        if frame is None or column not in frame.columns:
+            return []
+        return frame[column].dropna().astype(str).tolist()
+    return [line.strip() for line in data.decode("utf-8", errors="replace").splitlines() if line.strip()]
+
+
+@st.cache_data(show_spinner="Analyzing...", max_entries=32)
+def analyzeLines(lines, type):
+    """Score every line in one batched, result-cached pass"""
+    results = modals.analyzeBatch(lines, BACKEND_OF[type])
+    
+    if type == TEXTBLOB:
+        rows = [{
+            "text": line,
+            "label": result.labelText(),
+            "polarity": result.score,
+            "subjectivity": round(result.get("subjectivity"), 2)
+        } for line, result in zip(lines, results)]
+    else:
+        rows = [{"text": line, "label": result.labelText(), **result.scoreDict()}
+                for line, result in zip(lines, results)]
+    
+    aggregate = aggregates.SentimentAggregate().update(results)
+    backend = BACKEND_OF[type].lower()
+    counts = {labelName(label, backend): count for label, count in aggregate.counts().items()}
+    return pd.DataFrame(rows), counts
+
+
+def showLines(lines, type):
+    frame, counts = analyzeLines(lines, type)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Lines", len(frame), None)
+    col2.metric("Most common", next(iter(counts), "-"), None)
+    if type == TEXTBLOB:
+        col3.metric("Mean polarity", round(frame["polarity"].mean(), 2), None)
+    
+    # Column headers sort the table
+    st.dataframe(frame, use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Labels")
+        plotPie(list(counts.keys()), list(counts.values()))
+    with col2:
+        if type == TEXTBLOB:
+            st.subheader("Polarity")
+            st.plotly_chart(go.Figure(go.Histogram(x=frame["polarity"], nbinsx=20)))
+        else:
+            st.subheader("Mean emotion")
+            means = frame[["Happy", "Sad", "Angry", "Fear", "Surprise"]].mean()
+            st.plotly_chart(go.Figure(go.Bar(x=means.index, y=means.values)))
+    
+    st.download_button("Download results", frame.to_csv(index=False), file_name="sentiments.csv", mime="text/csv")
+
+
 def renderPage():
     st.title("Sentiment Analysis 🎭")
     components.html("""<hr style="height:3px;border:none;color:#333;background-color:#333; margin-bottom: 10px" /> """)
@@ -70,21 +152,54 @@ def renderPage():
     st.text("Analyzing text data given by the user and find sentiments within it.")
     st.text("")
     
-    userText = st.text_input('User Input', placeholder='Input text HERE')
+    mode = st.radio('Input', ('Single line', 'Multiple lines', 'Upload file'), horizontal=True)
+    
+    userText = ""
+    lines = []
+    if mode == 'Single line':
+        userText = st.text_input('User Input', placeholder='Input text HERE')
+    elif mode == 'Multiple lines':
+        text = st.text_area('User Input', placeholder='One text per line', height=200)
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+    else:
+        uploaded = st.file_uploader('Text or CSV file', type=['txt', 'csv'])
+        if uploaded is not None:
+            column = None
+            if uploaded.name.lower().endswith(".csv"):
+                header = readCsv(uploaded.getvalue(), nrows=0)
+                if header is not None:
+                    column = st.selectbox('Text column', list(header.columns))
+            if column is not None or not uploaded.name.lower().endswith(".csv"):
+                lines = readLines(uploaded, column)
+    
     type = st.selectbox(
         'Type of analysis',
-        ('Positive/Negative/Neutral - TextBlob', 'Happy/Sad/Angry/Fear/Surprise - text2emotion')
+        (TEXTBLOB, TEXT2EMOTION)
     )
     
+    if len(lines) > MAX_LINES:
+        st.info(f"Only the first {MAX_LINES} of {len(lines)} lines are analyzed.")
+        lines = lines[:MAX_LINES]
+    
     st.text("")
     
     if st.button('Predict'):
-        if userText != "" and type is not None:
-            st.text("")
-            st.components.v1.html("""
-            <h3 style="color: #0284c7; font-family: Source Sans Pro, sans-serif; font-size: 28px; margin-bottom: 10px; margin-top: 50px;">Result</h3>
-            """, height=100)
-            
+        if (mode == 'Single line' and userText == "") or (mode != 'Single line' and not lines):
+            st.warning("Please enter some text to analyze!")
+            st.session_state.pop("textPrediction", None)
+        else:
+            st.session_state["textPrediction"] = (mode, userText, tuple(lines), type)
+    
+    # Kept across reruns so sorting the table or resizing does not need Predict again
+    prediction = st.session_state.get("textPrediction")
+    if prediction is not None and prediction[0] == mode:
+        _, userText, lines, type = prediction
+        st.text("")
+        st.components.v1.html("""
+        <h3 style="color: #0284c7; font-family: Source Sans Pro, sans-serif; font-size: 28px; margin-bottom: 10px; margin-top: 50px;">Result</h3>
+        """, height=100)
+        
+        if mode == 'Single line':
             getSentiments(userText, type)
         else:
-            st.warning("Please enter some text to analyze!")
+            showLines(list(lines), type)
@@ -0,0 +1,213 @@
+import time
+
+import cv2
+import numpy as np
+
+import modals
+
+# Side of the grey thumbnails used to measure motion between sampled frames
+THUMBNAIL_SIDE = 64
+
+
+def _thumbnail(gray):
+    return cv2.resize(gray, (THUMBNAIL_SIDE, THUMBNAIL_SIDE), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    overlapW = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    overlapH = max(0, min(ay + ah, by + bh) - max(ay, by))
+    overlap = overlapW * overlapH
+    union = aw * ah + bw * bh - overlap
+    return overlap / union if union else 0.0
+
+
+class FaceTrack:
+    """A face followed between keyframes by template matching"""
+
+    def __init__(self, trackId, box, emotions, gray):
+        self.id = trackId
+        self.emotions = emotions
+        self.reset(box, gray)
+
+    def reset(self, box, gray):
+        """Re-anchor the track on a fresh detection"""
+        x, y, w, h = box
+        self.box = box
+        self.template = gray[y:y + h, x:x + w].copy()
+
+    def follow(self, gray, minScore):
+        """
+        Move the box to the best template match near its last position
+
+        Returns:
+            bool: Whether the face was found again
+        """
+        x, y, w, h = self.box
+        if self.template.size == 0:
+            return False
+
+        height, width = gray.shape
+        x0, y0 = max(0, x - w // 2), max(0, y - h // 2)
+        x1, y1 = min(width, x + w + w // 2), min(height, y + h + h // 2)
+        window = gray[y0:y1, x0:x1]
+        if window.shape[0] < self.template.shape[0] or window.shape[1] < self.template.shape[1]:
+            return False
+
+        scores = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (bestX, bestY) = cv2.minMaxLoc(scores)
+        if best < minScore:
+            return False
+
+        self.box = (x0 + bestX, y0 + bestY, w, h)
+        return True
+
+
+def analyzeVideo(source, keyframeInterval=15, minStep=1, maxStep=8, lowMotion=2.0,
+                 sceneChange=25.0, trackScore=0.5, detectMaxSide=modals.DETECT_MAX_SIDE, maxFrames=None,
+                 annotate=True):
+    """
+    Stream per-face emotions from a video file or camera
+
+    Frames are sampled adaptively: the step between analyzed frames doubles
+    while the picture is nearly still and halves again when it moves. Full
+    FER detection only runs on keyframes, which happen every
+    ``keyframeInterval`` analyzed frames, on scene changes and when a track
+    is lost. In between, faces are followed by template matching and keep
+    the emotions measured at the last keyframe.
+
+    Args:
+        source (str | int): Video file path, or camera index for a webcam
+        keyframeInterval (int): Analyzed frames between two detections
+        minStep (int): Smallest number of frames between analyzed frames
+        maxStep (int): Largest number of frames between analyzed frames
+        lowMotion (float): Mean thumbnail difference below which the step grows
+        sceneChange (float): Mean thumbnail difference that forces a keyframe
+        trackScore (float): Template match score below which a track is lost
+        detectMaxSide (int): Longest side face detection runs on
+        maxFrames (int): Stop after this many source frames
+        annotate (bool): Include an annotated copy of each analyzed frame
+
+    Yields:
+        dict: One update per analyzed frame with frame, time, keyframe,
+        faces (id, box, emotions) and, when annotating, image
+    """
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video source: {source}")
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    detector = modals.getModel("fer")
+
+    tracks = []
+    nextId = 1
+    step = minStep
+    sinceKeyframe = keyframeInterval
+    previous = None
+    frameIndex = -1
+
+    try:
+        while maxFrames is None or frameIndex + step < maxFrames:
+            # Skipped frames are only grabbed, never decoded
+            for _ in range(step - 1):
+                capture.grab()
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frameIndex += step
+
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            thumbnail = _thumbnail(gray)
+            motion = float(np.mean(np.abs(thumbnail - previous))) if previous is not None else sceneChange
+            previous = thumbnail
+
+            if motion < lowMotion:
+                step = min(maxStep, step * 2)
+            else:
+                step = max(minStep, step // 2)
+
+            keyframe = motion >= sceneChange or sinceKeyframe >= keyframeInterval
+            if not keyframe:
+                lost = [track for track in tracks if not track.follow(gray, trackScore)]
+                keyframe = bool(lost)
+
+            if keyframe:
+                boxes = modals.detectFaces(frame, detectMaxSide)
+                detections = detector.detect_emotions(frame, face_rectangles=boxes) if boxes else []
+
+                matched = []
+                unmatched = list(tracks)
+                for detection in detections:
+                    box = tuple(detection["box"])
+                    best = max(unmatched, key=lambda track: _iou(track.box, box), default=None)
+                    if best is not None and _iou(best.box, box) >= 0.3:
+                        unmatched.remove(best)
+                        best.reset(box, gray)
+                        best.emotions = detection["emotions"]
+                        track = best
+                    else:
+                        track = FaceTrack(nextId, box, detection["emotions"], gray)
+                        nextId += 1
+                    matched.append(track)
+
+                tracks = matched
+                sinceKeyframe = 0
+            else:
+                sinceKeyframe += 1
+
+            faces = [{"id": track.id, "box": track.box, "emotions": track.emotions} for track in tracks]
+            update = {
+                "frame": frameIndex,
+                "time": frameIndex / fps,
+                "keyframe": keyframe,
+                "faces": faces
+            }
+            if annotate:
+                update["image"] = modals.annotateImage(frame, faces)
+            yield update
+    finally:
+        capture.release()
+
+
+def summarize(updates, fps, elapsed):
+    """
+    Collapse a finished stream of updates into per-face emotion timelines
+
+    Returns:
+        dict: faces (id -> list of (time, emotions) at keyframes), frame and
+        keyframe counts, and the processing speed relative to real time
+    """
+    timelines = {}
+    keyframes = 0
+    lastFrame = 0
+    for update in updates:
+        lastFrame = update["frame"]
+        if update["keyframe"]:
+            keyframes += 1
+            for face in update["faces"]:
+                timelines.setdefault(face["id"], []).append((update["time"], face["emotions"]))
+
+    duration = (lastFrame + 1) / fps
+    return {
+        "faces": timelines,
+        "analyzedFrames": len(updates),
+        "keyframes": keyframes,
+        "realTimeFactor": duration / elapsed if elapsed else 0.0
+    }
+
+
+def videoInfo(source):
+    """Frame rate (30 if unknown) and frame count (0 if unknown) of a video source"""
+    capture = cv2.VideoCapture(source)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    frameCount = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    capture.release()
+    return fps, frameCount
+
+
+def analyzeVideoFile(path, **options):
+    """Run analyzeVideo to the end and return its summary"""
+    start = time.perf_counter()
+    updates = list(analyzeVideo(path, annotate=False, **options))
+    return summarize(updates, videoInfo(path)[0], time.perf_counter() - start)